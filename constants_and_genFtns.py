@@ -4,13 +4,20 @@
 
 module: constants_and_genFtns.py
 
-module contents (5 ftns + 8 constants):
+module contents (12 ftns + 12 constants):
 
     - getPosition (written by Al Sweigart)
     - oppDirection
     - blankBetw
     - adjacent2
     - anyQRSinCell
+    - packBoard
+    - unpackBoard
+    - getPackedTile
+    - getPackedPosition
+    - makePackedMove
+    - validate
+    - getRandomSolvableBoard
     
 
 Released under a GNU GPLv3 license. 
@@ -40,6 +47,8 @@ Released under a GNU GPLv3 license.
 #    along with this program.  (License is found in the COPYING.txt file.)
 #    If not, see <https://www.gnu.org/licenses/>.
 
+import random
+
 #############################################################################
 ### constants (all are from Al Sweigart's Slide Puzzle code)
 #############################################################################
@@ -53,6 +62,7 @@ DOWN = 'down'
 LEFT = 'left'
 RIGHT = 'right'
 SOLVED = 'Solved!'
+MOVECAP = 'Move cap exceeded'
 
 #############################################################################
 ### general ftns used in several slidePuzzle modules
@@ -61,6 +71,11 @@ SOLVED = 'Solved!'
 # getPosition was written by Al Sweigart
 def getPosition(board, tileVal):
     # Return the x and y of board coordinates for the given tile.
+    if isinstance(board, int):
+        return getPackedPosition(board, tileVal)
+    # A Board (see puzzleBoard.py) keeps its own tile position index.
+    if hasattr(board, 'positions'):
+        return board.positions[tileVal]
     for x in range(BOARDWIDTH):
         for y in range(BOARDHEIGHT):
             if board[x][y] == tileVal:
@@ -153,6 +168,217 @@ def anyQRSinCell(Qx, Qy, Rx, Ry, Sx, Sy, cell):
     else:
         return False
 
+#############################################################################
+### packed board ftns
+#############################################################################
+
+# A packed board is a single int holding one 4-bit nibble per cell.  Cell
+# (x, y) lives in nibble number y * BOARDWIDTH + x, so the first row occupies
+# the low 16 bits.  BLANK is stored as 0; tiles 1 - 15 are stored as
+# themselves.  A 4-by-4 board therefore fits in 64 bits, is hashable, and can
+# be compared with ==, which makes it a convenient key for caches and for
+# de-duplicating boards.
+
+# packed form of the solved board: tile n is in cell n - 1 (see packBoard)
+SOLVEDPACKED = sum(tile << (4 * (tile - 1))
+                   for tile in range(1, BOARDWIDTH * BOARDHEIGHT))
+
+# moves of the blank out of each cell: (move, cell the blank moves into)
+BLANKMOVES = []
+for cell in range(BOARDWIDTH * BOARDHEIGHT):
+    moves = []
+    if cell >= BOARDWIDTH:
+        moves.append((UP, cell - BOARDWIDTH))
+    if cell < BOARDWIDTH * (BOARDHEIGHT - 1):
+        moves.append((DOWN, cell + BOARDWIDTH))
+    if cell % BOARDWIDTH > 0:
+        moves.append((LEFT, cell - 1))
+    if cell % BOARDWIDTH < BOARDWIDTH - 1:
+        moves.append((RIGHT, cell + 1))
+    BLANKMOVES.append(moves)
+del cell, moves
+
+# the low bit of every nibble (see getPackedPosition)
+NIBBLELOWBITS = sum(1 << (4 * cell) for cell in range(BOARDWIDTH * BOARDHEIGHT))
+
+def packBoard(board):
+    """Returns the packed (int) form of 'board', a list of columns.  A board
+    that is already packed is returned unchanged."""
+    if isinstance(board, int):
+        return board
+    if hasattr(board, 'packed'):
+        return board.packed
+    packed = 0
+    for x in range(BOARDWIDTH):
+        for y in range(BOARDHEIGHT):
+            if board[x][y] != BLANK:
+                packed |= board[x][y] << (4 * (y * BOARDWIDTH + x))
+    return packed
+
+
+def unpackBoard(packed):
+    """Returns the list-of-columns form of a packed board.  Anything that is
+    not an int is returned unchanged, so callers can accept either form."""
+    if not isinstance(packed, int):
+        return packed
+    board = []
+    for x in range(BOARDWIDTH):
+        column = []
+        for y in range(BOARDHEIGHT):
+            tile = (packed >> (4 * (y * BOARDWIDTH + x))) & 0xF
+            column.append(tile if tile else BLANK)
+        board.append(column)
+    return board
+
+
+def getPackedTile(packed, x, y):
+    """Returns the tile (1 - 15 or BLANK) in cell (x, y) of a packed board."""
+    tile = (packed >> (4 * (y * BOARDWIDTH + x))) & 0xF
+    return tile if tile else BLANK
+
+
+def getPackedPosition(packed, tileVal):
+    """Returns the (x, y) board coordinates of tileVal on a packed board."""
+    if tileVal == BLANK or tileVal == 0:
+        # The blank is a 0 nibble.  OR each nibble's bits into its low bit;
+        # the low bits left clear are those of the 0 nibbles, and the lowest
+        # of them is the one the scan below would find first.
+        folded = packed | (packed >> 1)
+        folded |= folded >> 2
+        zeros = ~folded & NIBBLELOWBITS
+        if not zeros:
+            return None
+        cell = ((zeros & -zeros).bit_length() - 1) // 4
+        return (cell % BOARDWIDTH, cell // BOARDWIDTH)
+    for cell in range(BOARDWIDTH * BOARDHEIGHT):
+        if (packed >> (4 * cell)) & 0xF == tileVal:
+            return (cell % BOARDWIDTH, cell // BOARDWIDTH)
+
+
+def makePackedMove(packed, move, alg_ON=False):
+    """Returns the packed board that results from making 'move' on a packed
+    board.  As with makeMove, the move is not checked for validity.  When
+    alg_ON is True, 'move' is the direction the blank moves; otherwise it is
+    the direction the clicked tile moves."""
+    blankx, blanky = getPackedPosition(packed, BLANK)
+    if not alg_ON:
+        move = oppDirection(move)
+    if move == UP:
+        tilex, tiley = blankx, blanky - 1
+    elif move == DOWN:
+        tilex, tiley = blankx, blanky + 1
+    elif move == LEFT:
+        tilex, tiley = blankx - 1, blanky
+    elif move == RIGHT:
+        tilex, tiley = blankx + 1, blanky
+    tileShift = 4 * (tiley * BOARDWIDTH + tilex)
+    blankShift = 4 * (blanky * BOARDWIDTH + blankx)
+    tile = (packed >> tileShift) & 0xF
+    # The blank's nibble is 0, so the swap is one subtraction and one addition.
+    return packed - (tile << tileShift) + (tile << blankShift)
+
+#############################################################################
+### board validation
+#############################################################################
+
+# A board is solvable exactly when the parity of its permutation (the tiles
+# and the blank, cell by cell, against the cells they have on the solved
+# board) equals the parity of the blank's distance from its solved cell.  For
+# the usual goal, with the blank in the bottom right corner, that is the
+# familiar rule of inversions plus the blank's row.  The permutation parity
+# is found by counting cycles, so the whole check is O(n) in the number of
+# cells instead of the O(n**2) of counting inversions.
+
+def validate(board, SOLVEDBOARD=None):
+    """Returns None if 'board' (a list of columns, a Board or a packed board)
+    is well formed and can be solved, and otherwise a message saying what is
+    wrong with it.  The board is checked against SOLVEDBOARD, which also sets
+    the dimensions; by default that is the usual BOARDWIDTH by BOARDHEIGHT
+    goal with the blank in the last cell."""
+    board = unpackBoard(board)
+    if SOLVEDBOARD is None:
+        width, height = BOARDWIDTH, BOARDHEIGHT
+        cellCount = width * height
+        # goalCells[tile] is the tile's solved cell; goalCells[0] the blank's
+        goalCells = [cellCount - 1] + list(range(cellCount - 1))
+    else:
+        SOLVEDBOARD = unpackBoard(SOLVEDBOARD)
+        width, height = len(SOLVEDBOARD), len(SOLVEDBOARD[0])
+        cellCount = width * height
+        goalCells = [0] * cellCount
+        for x in range(width):
+            for y in range(height):
+                tile = SOLVEDBOARD[x][y]
+                goalCells[0 if tile == BLANK else tile] = y * width + x
+
+    try:
+        if len(board) != width or any(len(column) != height for column in board):
+            return 'Board is not ' + str(width) + ' by ' + str(height)
+    except TypeError:
+        return 'Board is not a list of columns'
+
+    # permutation[cell] is the solved cell of whatever is in 'cell'
+    permutation = [0] * cellCount
+    seen = [False] * cellCount
+    duplicate = None
+    blanks = 0
+    for x in range(width):
+        for y in range(height):
+            tile = board[x][y]
+            if tile == BLANK:
+                blanks += 1
+                tile = 0
+                blankCell = y * width + x
+            elif (not isinstance(tile, int) or isinstance(tile, bool) or
+                  not 0 < tile < cellCount):
+                return 'Not a tile: ' + repr(tile)
+            elif seen[tile] and duplicate is None:
+                duplicate = tile
+            seen[tile] = True
+            permutation[y * width + x] = goalCells[tile]
+    if blanks == 0:
+        return 'Board has no BLANK'
+    elif blanks > 1:
+        return 'Board has more than one BLANK'
+    elif duplicate is not None:
+        return 'Duplicate tile: ' + str(duplicate)
+
+    cycles = 0
+    visited = [False] * cellCount
+    for cell in range(cellCount):
+        if not visited[cell]:
+            cycles += 1
+            while not visited[cell]:
+                visited[cell] = True
+                cell = permutation[cell]
+    permutationParity = (cellCount - cycles) % 2
+    goalCell = goalCells[0]
+    blankDistance = (abs(blankCell % width - goalCell % width) +
+                     abs(blankCell // width - goalCell // width))
+    if permutationParity != blankDistance % 2:
+        return 'Board cannot be solved'
+    return None
+
+
+def getRandomSolvableBoard():
+    """Returns a board (a list of columns) drawn uniformly from all of the
+    solvable boards.  The tiles and the blank are shuffled; if the result
+    cannot be solved, two tiles are swapped.  A swap changes the parity, so
+    it pairs each unsolvable board with exactly one solvable board, and
+    every solvable board is equally likely.  O(n) in the number of cells."""
+    cellCount = BOARDWIDTH * BOARDHEIGHT
+    cells = list(range(1, cellCount)) + [BLANK]
+    random.shuffle(cells)
+    board = [[cells[y * BOARDWIDTH + x] for y in range(BOARDHEIGHT)]
+             for x in range(BOARDWIDTH)]
+    if validate(board):
+        # swap the tiles in the first two cells that do not hold the blank
+        a, b = [cell for cell in range(3) if cells[cell] != BLANK][:2]
+        ax, ay = a % BOARDWIDTH, a // BOARDWIDTH
+        bx, by = b % BOARDWIDTH, b // BOARDWIDTH
+        board[ax][ay], board[bx][by] = board[bx][by], board[ax][ay]
+    return board
+
 #############################################################################
 ### 
 #############################################################################
@@ -1159,6 +1159,7 @@ def getTiles(row, board, lastMove):
     tiles are retrieved, calls to makeAdjacent4 and order4 can be made.  This
     ftn only gets called when row in ('first', 'second')."""
 
+    board = unpackBoard(board)
     blankx, blanky = getPosition(board, BLANK)
     if row == 'first':
         topRow, bottomRow = 0, 1
@@ -1240,6 +1241,7 @@ def bubbleUp(target, row, board, lastMove):
     before blank gets near the target tile, when blanky in (0, 1) I do not
     directly focus on retrieving the target tile."""
 
+    board = unpackBoard(board)
     blankx, blanky = getPosition(board, BLANK)
     if row == 'first':
         topRow, bottomRow = 0, 1
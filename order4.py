@@ -699,6 +699,7 @@ def order4(row, board):
     getNextMove in slidePuzzle_algorithm_ver01.py.  Ta-Td have yet to be
     "made adjacent".  Blank will be in either the topRow or the bottomRow."""
 
+    board = unpackBoard(board)
     blankx, blanky = getPosition(board, BLANK)
     if row == 'first':
         topRow, bottomRow = 0, 1
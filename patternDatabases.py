@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Greg Schaefer
+
+module name: patternDatabases.py
+
+module contents (10 ftns):
+
+    - getPatternIndex
+    - getPatternFile
+    - floodRegion
+    - buildPatternDatabase
+    - packNibbles
+    - buildPatternDatabases
+    - loadPatternDatabases
+    - getPatternValue
+    - patternHeuristic
+    - main
+
+Released under a GNU GPLv3 license.
+
+"""
+
+#############################################################################
+### patternDatabases.py COPYRIGHT:
+#############################################################################
+
+# SlidePuzzlePlus, patternDatabases.py
+# By Greg Schaefer (schae029@gmail.com)
+
+#  Copyright (C) 2020 by Gregory N. Schaefer
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  (License is found in the COPYING.txt file.)
+#    If not, see <https://www.gnu.org/licenses/>.
+
+#############################################################################
+### patternDatabases.py
+#############################################################################
+
+# Additive disjoint pattern databases for the 4-by-4 goal produced by
+# getStartingBoard (tile n in cell n - 1, blank in the last cell).  The tiles
+# are split into disjoint groups (PARTITION, 6-6-3 by default).  For each
+# group, a breadth-first search back from the goal finds the fewest moves
+# of the group's own tiles needed to bring them home, ignoring the other
+# tiles except as obstacles for the blank.  Because each move moves only
+# one tile, the values for the groups can be added and the sum is still a
+# lower bound for the whole board, usually a much better one than the
+# Manhattan distance.
+#    A group's state is indexed by getPatternIndex: one nibble per tile in
+# the group, holding the tile's cell (y * BOARDWIDTH + x).  The value minus
+# the group's Manhattan distance is always even, so the files store half of
+# that difference, capped at 15, in one nibble per index (two per byte).
+# The files are built once, offline (python patternDatabases.py; this needs
+# numpy), and loaded with mmap, so every solver process on a host shares the
+# same pages and nothing is rebuilt at start-up.
+
+import os
+import mmap
+from constants_and_genFtns import *
+
+PARTITION = ((1, 5, 6, 9, 10, 13), (7, 8, 11, 12, 14, 15), (2, 3, 4))
+
+PDBDIR = os.path.dirname(os.path.abspath(__file__))
+
+# bit masks over the 16 cells; bit 'cell' is set for each cell in the set
+NOTFIRSTCOL = 0xEEEE
+NOTLASTCOL = 0x7777
+ALLCELLS = 0xFFFF
+
+#############################################################################
+### Helper ftns
+#############################################################################
+
+def getPatternIndex(cells, pattern):
+    """Returns the index of 'pattern' (a tuple of tiles) for the flat list
+    of cells 'cells' (0 for the blank)."""
+    index = 0
+    for i in range(len(pattern)):
+        index |= cells.index(pattern[i]) << (4 * i)
+    return index
+
+
+def getPatternFile(pattern, directory=PDBDIR):
+    return os.path.join(directory, 'sp_pdb_' +
+                        '_'.join(str(tile) for tile in pattern) + '.bin')
+
+
+def floodRegion(np, seeds, free):
+    """Returns, for each element of the arrays seeds and free (cell bit
+    masks), the cells of 'free' connected to the seed cell."""
+    region = seeds
+    while True:
+        grown = (region | ((region << 1) & NOTFIRSTCOL) |
+                 ((region >> 1) & NOTLASTCOL) | (region << 4) |
+                 (region >> 4)) & free
+        if np.array_equal(grown, region):
+            return region
+        region = grown
+
+
+def packNibbles(np, values):
+    """Returns the bytes for an array of nibble values, two per byte with the
+    even index in the low nibble."""
+    values = values.astype(np.uint8)
+    return (values[0::2] | (values[1::2] << 4)).tobytes()
+
+#############################################################################
+### Building the databases (offline; needs numpy)
+#############################################################################
+
+def buildPatternDatabase(pattern, chunkSize=500000):
+    """Returns a numpy array, indexed by getPatternIndex, of the fewest moves
+    of the pattern's tiles needed to bring them to their goal cells.
+    Entries for impossible indexes (two tiles in one cell) are 255.
+       The search state is the pattern's positions plus the region of
+    non-pattern cells the blank is in (the blank can move about its region
+    for free), represented by the region's lowest cell."""
+    import numpy as np
+
+    k = len(pattern)
+    size = 16 ** k
+    values = np.full(size, 255, dtype=np.uint8)
+    # seen[index] has bit r set once the state with region r has been queued
+    seen = np.zeros(size, dtype=np.uint16)
+
+    goal = np.array([getPatternIndex(
+        [tile if tile < 16 else 0 for tile in range(1, 17)], pattern)],
+        dtype=np.int64)
+    occupied = sum(1 << (tile - 1) for tile in pattern)
+    region = floodRegion(np, np.array([1 << 15], dtype=np.int64),
+                         np.array([ALLCELLS & ~occupied], dtype=np.int64))
+    values[goal] = 0
+    frontier = [(goal, region)]
+    level = 0
+    lowestCell = {1 << cell: cell for cell in range(16)}
+    while frontier:
+        level += 1
+        nextFrontier = []
+        for indexes, regions in frontier:
+            for start in range(0, len(indexes), chunkSize):
+                idx = indexes[start:start + chunkSize]
+                reg = regions[start:start + chunkSize]
+                occ = np.zeros_like(idx)
+                for i in range(k):
+                    occ |= np.int64(1) << ((idx >> (4 * i)) & 15)
+                newIdx, newReg = [], []
+                for i in range(k):
+                    cell = (idx >> (4 * i)) & 15
+                    for step in (-4, 4, -1, 1):
+                        target = cell + step
+                        ok = (target >= 0) & (target < 16)
+                        if step == -1:
+                            ok &= (cell % 4) != 0
+                        elif step == 1:
+                            ok &= (cell % 4) != 3
+                        target = np.where(ok, target, 0)
+                        ok &= ((reg >> target) & 1) == 1
+                        if not ok.any():
+                            continue
+                        c, t = cell[ok], target[ok]
+                        newOcc = occ[ok] - (np.int64(1) << c) + (np.int64(1) << t)
+                        newIdx.append(idx[ok] + ((t - c) << (4 * i)))
+                        newReg.append(floodRegion(np, np.int64(1) << c,
+                                                  ALLCELLS & ~newOcc))
+                if not newIdx:
+                    continue
+                newIdx = np.concatenate(newIdx)
+                newReg = np.concatenate(newReg)
+                lowest = newReg & -newReg
+                bits = np.zeros_like(lowest)
+                for bit, cell in lowestCell.items():
+                    bits[lowest == bit] = cell
+                keys, first = np.unique(newIdx * 16 + bits, return_index=True)
+                newIdx, newReg, bits = newIdx[first], newReg[first], bits[first]
+                fresh = (seen[newIdx] >> bits) & 1 == 0
+                newIdx, newReg, bits = newIdx[fresh], newReg[fresh], bits[fresh]
+                if len(newIdx) == 0:
+                    continue
+                np.bitwise_or.at(seen, newIdx,
+                                 (np.uint16(1) << bits.astype(np.uint16)))
+                unset = values[newIdx] == 255
+                values[newIdx[unset]] = level
+                nextFrontier.append((newIdx, newReg))
+        frontier = nextFrontier
+    return values
+
+
+def buildPatternDatabases(partition=PARTITION, directory=PDBDIR):
+    """Builds and writes the nibble-packed file for every pattern in
+    'partition'."""
+    import numpy as np
+
+    for pattern in partition:
+        values = buildPatternDatabase(pattern)
+        # Manhattan distance of the pattern's tiles for every index
+        index = np.arange(16 ** len(pattern), dtype=np.int64)
+        manhattan = np.zeros(len(index), dtype=np.int64)
+        for i in range(len(pattern)):
+            cell = (index >> (4 * i)) & 15
+            goalCell = pattern[i] - 1
+            manhattan += (np.abs(cell % 4 - goalCell % 4) +
+                          np.abs(cell // 4 - goalCell // 4))
+        extra = np.where(values == 255, 0,
+                         np.minimum(15, (values.astype(np.int64) - manhattan) // 2))
+        with open(getPatternFile(pattern, directory), 'wb') as file_object:
+            file_object.write(packNibbles(np, extra))
+
+#############################################################################
+### Using the databases
+#############################################################################
+
+def loadPatternDatabases(partition=PARTITION, directory=PDBDIR):
+    """Returns a list of read-only mmaps, one per pattern in 'partition', or
+    None if any of the files has not been built or is not the size its
+    pattern needs (one nibble per index, as written by
+    buildPatternDatabases)."""
+    databases = []
+    for pattern in partition:
+        filename = getPatternFile(pattern, directory)
+        size = 16 ** len(pattern) // 2
+        if not os.path.exists(filename) or os.path.getsize(filename) != size:
+            return None
+        with open(filename, 'rb') as file_object:
+            databases.append(mmap.mmap(file_object.fileno(), 0,
+                                       access=mmap.ACCESS_READ))
+        if len(databases[-1]) != size:
+            return None  # the file changed after the size check
+    return databases
+
+
+def getPatternValue(database, index):
+    """Returns the stored nibble (half the moves beyond the Manhattan
+    distance) for a pattern index."""
+    byte = database[index >> 1]
+    return (byte >> 4) if index & 1 else (byte & 0xF)
+
+
+def patternHeuristic(cells, databases, partition=PARTITION):
+    """Returns the additive pattern database lower bound for the flat list
+    of cells 'cells' (0 for the blank)."""
+    bound = 0
+    for cell in range(BOARDWIDTH * BOARDHEIGHT):
+        tile = cells[cell]
+        if tile:
+            bound += (abs(cell % 4 - (tile - 1) % 4) +
+                      abs(cell // 4 - (tile - 1) // 4))
+    for pattern, database in zip(partition, databases):
+        bound += 2 * getPatternValue(database, getPatternIndex(cells, pattern))
+    return bound
+
+
+def main():
+    buildPatternDatabases()
+
+
+if __name__ == '__main__':
+    main()
+
+#############################################################################
+###
+#############################################################################
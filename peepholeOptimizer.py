@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Greg Schaefer
+
+module name: peepholeOptimizer.py
+
+module contents (6 ftns):
+
+    - getBlankCell
+    - cancelInversePairs
+    - getPackedStates
+    - tileDistance
+    - shortestPath
+    - optimizeMoves
+
+Released under a GNU GPLv3 license.
+
+"""
+
+#############################################################################
+### peepholeOptimizer.py COPYRIGHT:
+#############################################################################
+
+# SlidePuzzlePlus, peepholeOptimizer.py
+# By Greg Schaefer (schae029@gmail.com)
+
+#  Copyright (C) 2020 by Gregory N. Schaefer
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  (License is found in the COPYING.txt file.)
+#    If not, see <https://www.gnu.org/licenses/>.
+
+#############################################################################
+### peepholeOptimizer.py
+#############################################################################
+
+# Post-processing for the moves made by the algorithm.  getNextMove works one
+# move at a time and only guards against undoing the previous move, so its
+# solutions contain detours: a move followed later by its opposite once the
+# intervening moves have cancelled out, or a handful of moves which could be
+# made in fewer.  optimizeMoves shortens a finished move list in two passes:
+#
+#   - cancelInversePairs removes every move that is immediately followed by
+#     its opposite (repeatedly, so UP LEFT RIGHT DOWN disappears entirely).
+#   - each window of 'window' consecutive moves is replaced by the shortest
+#     path between the boards at its two ends, found by a bidirectional
+#     breadth-first search bounded by the window's length.
+#
+# Every move changes the colour (as on a chess board) of the blank's cell, so
+# all paths between two boards have the same parity, and a window of k moves
+# can only be replaced by k - 2 moves or fewer.  The search is bounded by
+# k - 2, and is skipped altogether when the tiles' Manhattan distances between
+# the window's ends (see tileDistance) already add up to more than that.
+#
+# The moves are blank moves (as made with alg_ON=True) and the boards are
+# packed boards (see packBoard).  The optimized list always leads to the same
+# final board as the original one.  getNextMove itself is not changed.
+
+from constants_and_genFtns import *
+
+WINDOW = 8  # default number of moves in a window
+
+#############################################################################
+### Helper ftns
+#############################################################################
+
+def getBlankCell(packed):
+    """Returns the cell (y * BOARDWIDTH + x) of the blank on a packed board."""
+    blankx, blanky = getPackedPosition(packed, BLANK)
+    return blanky * BOARDWIDTH + blankx
+
+
+def cancelInversePairs(moves):
+    """Returns a copy of 'moves' with every move that is followed by its
+    opposite removed, along with that opposite move."""
+    kept = []
+    for move in moves:
+        if kept and kept[-1] == oppDirection(move):
+            kept.pop()
+        else:
+            kept.append(move)
+    return kept
+
+
+def getPackedStates(packed, moves):
+    """Returns the list of packed boards visited when 'moves' are made from
+    the packed board 'packed', starting with 'packed' itself."""
+    states = [packed]
+    for move in moves:
+        packed = makePackedMove(packed, move, True)
+        states.append(packed)
+    return states
+
+
+def tileDistance(start, end):
+    """Returns the sum of the Manhattan distances between each tile's cells on
+    the packed boards 'start' and 'end'.  Every move moves one tile by one
+    cell, so no path from 'start' to 'end' is shorter than this."""
+    changed = start ^ end
+    distance = 0
+    for cell in range(BOARDWIDTH * BOARDHEIGHT):
+        shift = 4 * cell
+        if (changed >> shift) & 0xF:
+            tile = (start >> shift) & 0xF
+            if tile:
+                x, y = getPackedPosition(end, tile)
+                distance += abs(x - cell % BOARDWIDTH) + abs(y - cell // BOARDWIDTH)
+    return distance
+
+#############################################################################
+### Main functions for peepholeOptimizer.py
+#############################################################################
+
+def shortestPath(start, end, maxMoves):
+    """Returns the shortest list of blank moves which changes the packed board
+    'start' into the packed board 'end', or None if that takes more than
+    maxMoves moves."""
+    if start == end:
+        return []
+    # board -> (neighbouring board one step nearer start or end, move)
+    forward = {start: None}
+    backward = {end: None}
+    forwardFrontier = [(start, getBlankCell(start))]
+    backwardFrontier = [(end, getBlankCell(end))]
+    depth = 0
+    meet = None
+    while meet is None and depth < maxMoves and forwardFrontier and backwardFrontier:
+        depth += 1
+        # grow the smaller side by one level
+        if len(forwardFrontier) <= len(backwardFrontier):
+            frontier, seen, other = forwardFrontier, forward, backward
+        else:
+            frontier, seen, other = backwardFrontier, backward, forward
+        nextFrontier = []
+        for packed, blank in frontier:
+            for move, cell in BLANKMOVES[blank]:
+                shift = 4 * cell
+                tile = (packed >> shift) & 0xF
+                nextPacked = packed - (tile << shift) + (tile << (4 * blank))
+                if nextPacked in seen:
+                    continue
+                seen[nextPacked] = (packed, move)
+                if nextPacked in other:
+                    meet = nextPacked
+                    break
+                nextFrontier.append((nextPacked, cell))
+            if meet is not None:
+                break
+        if seen is forward:
+            forwardFrontier = nextFrontier
+        else:
+            backwardFrontier = nextFrontier
+    if meet is None:
+        return None
+
+    path = []
+    packed = meet
+    while forward[packed] is not None:
+        packed, move = forward[packed]
+        path.append(move)
+    path.reverse()
+    packed = meet
+    while backward[packed] is not None:
+        # backward links were made from the end, so they are walked in
+        # the opposite direction
+        packed, move = backward[packed]
+        path.append(oppDirection(move))
+    return path
+
+
+def optimizeMoves(board, moves, window=WINDOW):
+    """Returns a list of blank moves, no longer than 'moves', which leads from
+    'board' (a list board, Board or packed board) to the same final board as
+    'moves'."""
+    moves = cancelInversePairs(moves)
+    states = getPackedStates(packBoard(board), moves)
+    i = 0
+    while i < len(moves) - 1:
+        end = min(i + window, len(moves))
+        # a shorter path has at least two moves fewer (see above)
+        maxMoves = end - i - 2
+        if maxMoves < 0 or tileDistance(states[i], states[end]) > maxMoves:
+            path = None
+        else:
+            path = shortestPath(states[i], states[end], maxMoves)
+        if path is None:
+            i += 1
+            continue
+        moves = cancelInversePairs(moves[:i] + path + moves[end:])
+        states = getPackedStates(states[0], moves)
+        # the shorter path may open up savings in the windows just before it
+        i = max(0, i - window)
+    return moves
+
+#############################################################################
+###
+#############################################################################
@@ -0,0 +1,325 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Greg Schaefer
+
+module name: phaseTables.py
+
+module contents (12 ftns):
+
+    - rankPermutation
+    - unrankPermutation
+    - bandNeighbors
+    - getRowIndex
+    - buildFinalRowsTable
+    - buildRowTable
+    - loadTable
+    - getFinalRowsTable
+    - getRowTable
+    - finalRowsTableMove
+    - rowTableMove
+    - phaseTableMove
+
+Released under a GNU GPLv3 license.
+
+"""
+
+#############################################################################
+### phaseTables.py COPYRIGHT:
+#############################################################################
+
+# SlidePuzzlePlus, phaseTables.py
+# By Greg Schaefer (schae029@gmail.com)
+
+#  Copyright (C) 2020 by Gregory N. Schaefer
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  (License is found in the COPYING.txt file.)
+#    If not, see <https://www.gnu.org/licenses/>.
+
+#############################################################################
+### phaseTables.py
+#############################################################################
+
+# Once rows 0 and 1 are done, tiles 9 - 15 and the blank are confined to
+# rows 2 and 3, a band of 2 rows by 4 columns.  The band has only 8! = 40,320
+# configurations (half of which can be reached), so a breadth-first search
+# back from the solved band gives the optimal next move for every one of
+# them.  The table is built once and cached on disk next to this module.
+#    Band cell k is board cell (k % 4, 2 + k // 4).  A band state lists, for
+# each band cell, the tile in it as tile - 9 (0 - 6), with 7 for the blank.
+# The table holds one byte per state, indexed by rankPermutation(state): the
+# index into MOVECODES of the blank's next move, GOAL for the solved band,
+# or UNREACHABLE.
+#    The 'first' and 'second' phases use distance tables instead.  Only the
+# four row tiles and the blank are tracked; every other tile is a don't-care.
+# That is 16*15*14*13*12 = 524,160 states for the first row (the blank may go
+# anywhere) and 12*11*10*9*8 = 95,040 for the second (the blank stays out of
+# the finished first row).  A state is indexed by getRowIndex, one nibble
+# per tracked tile holding its cell number (y * BOARDWIDTH + x) and the
+# blank's cell in the top nibble, and the table holds the number of moves
+# needed to finish the row, or UNREACHABLE.  The next move is the one that
+# leads to a state one move closer, i.e. one table probe per candidate move.
+
+import os
+import tempfile
+from math import factorial
+from constants_and_genFtns import *
+
+MOVECODES = (UP, DOWN, LEFT, RIGHT)
+GOAL = 4
+UNREACHABLE = 255
+
+TABLEDIR = os.path.dirname(os.path.abspath(__file__))
+FINALROWSFILE = os.path.join(TABLEDIR, 'sp_finalRowsTable.bin')
+ROWFILES = {'first': os.path.join(TABLEDIR, 'sp_firstRowTable.bin'),
+            'second': os.path.join(TABLEDIR, 'sp_secondRowTable.bin')}
+# the tiles which make up each row, and the top row the blank may move in
+ROWTILES = {'first': (1, 2, 3, 4), 'second': (5, 6, 7, 8)}
+ROWTOPS = {'first': 0, 'second': 1}
+
+FINALROWSTABLE = None
+ROWTABLES = {}
+
+#############################################################################
+### Helper ftns
+#############################################################################
+
+def rankPermutation(perm):
+    """Returns the lexicographic rank (0 to n! - 1) of perm, a permutation of
+    0 to n - 1."""
+    rank = 0
+    n = len(perm)
+    for i in range(n):
+        smaller = 0
+        for j in range(i + 1, n):
+            if perm[j] < perm[i]:
+                smaller += 1
+        rank = rank * (n - i) + smaller
+    return rank
+
+
+def unrankPermutation(rank, n):
+    """Returns the permutation of 0 to n - 1 whose lexicographic rank is
+    'rank'.  This is the inverse of rankPermutation."""
+    digits = []
+    for base in range(1, n + 1):
+        digits.append(rank % base)
+        rank //= base
+    digits.reverse()
+    remaining = list(range(n))
+    return [remaining.pop(d) for d in digits]
+
+
+def bandNeighbors(state, width, height):
+    """Yields (move, nextState) for every legal move of the blank within a
+    band of the given width and height."""
+    blank = state.index(width * height - 1)
+    x, y = blank % width, blank // width
+    for move in MOVECODES:
+        if move == UP and y > 0:
+            target = blank - width
+        elif move == DOWN and y < height - 1:
+            target = blank + width
+        elif move == LEFT and x > 0:
+            target = blank - 1
+        elif move == RIGHT and x < width - 1:
+            target = blank + 1
+        else:
+            continue
+        nextState = list(state)
+        nextState[blank], nextState[target] = nextState[target], nextState[blank]
+        yield move, nextState
+
+def getRowIndex(tilePositions, blankPosition):
+    """Returns the row-table index for the four row tiles at the cells in
+    tilePositions and the blank at cell blankPosition."""
+    index = blankPosition << 16
+    for i in range(4):
+        index |= tilePositions[i] << (4 * i)
+    return index
+
+#############################################################################
+### Main functions for phaseTables.py
+#############################################################################
+
+def buildFinalRowsTable():
+    """Returns the final-rows table (a bytearray of 8! entries) built by a
+    breadth-first search from the solved band."""
+    width, height = BOARDWIDTH, 2
+    size = width * height
+    table = bytearray([UNREACHABLE]) * factorial(size)
+    solved = list(range(size))
+    table[rankPermutation(solved)] = GOAL
+    frontier = [solved]
+    while frontier:
+        nextFrontier = []
+        for state in frontier:
+            for move, nextState in bandNeighbors(state, width, height):
+                rank = rankPermutation(nextState)
+                if table[rank] == UNREACHABLE:
+                    # The way back is the opposite of the move that got here.
+                    table[rank] = MOVECODES.index(oppDirection(move))
+                    nextFrontier.append(nextState)
+        frontier = nextFrontier
+    return table
+
+
+def buildRowTable(row):
+    """Returns the distance table (a bytearray of 16**5 entries) for row
+    'first' or 'second', built by a breadth-first search from every state in
+    which the row is done."""
+    cellCount = BOARDWIDTH * BOARDHEIGHT
+    topCell = ROWTOPS[row] * BOARDWIDTH
+    goalCells = list(range(topCell, topCell + BOARDWIDTH))
+    # cells the blank may move into, and the moves out of each cell
+    neighbors = {}
+    for cell in range(topCell, cellCount):
+        x, y = cell % BOARDWIDTH, cell // BOARDWIDTH
+        neighbors[cell] = [c for c in (cell - BOARDWIDTH, cell + BOARDWIDTH)
+                           if topCell <= c < cellCount]
+        if x > 0:
+            neighbors[cell].append(cell - 1)
+        if x < BOARDWIDTH - 1:
+            neighbors[cell].append(cell + 1)
+
+    table = bytearray([UNREACHABLE]) * (1 << 20)
+    frontier = []
+    for blankPosition in range(topCell + BOARDWIDTH, cellCount):
+        index = getRowIndex(goalCells, blankPosition)
+        table[index] = 0
+        frontier.append(index)
+    distance = 0
+    while frontier:
+        distance += 1
+        nextFrontier = []
+        for index in frontier:
+            blankPosition = index >> 16
+            for cell in neighbors[blankPosition]:
+                nextIndex = index + ((cell - blankPosition) << 16)
+                # if a row tile is in 'cell', it moves into the blank's cell
+                for shift in (0, 4, 8, 12):
+                    if (index >> shift) & 0xF == cell:
+                        nextIndex += (blankPosition - cell) << shift
+                        break
+                if table[nextIndex] == UNREACHABLE:
+                    table[nextIndex] = distance
+                    nextFrontier.append(nextIndex)
+        frontier = nextFrontier
+    return table
+
+
+def loadTable(filename, size, builder):
+    """Returns the table stored in filename, building it with builder() and
+    saving it first if the file is missing or the wrong size."""
+    if os.path.exists(filename) and os.path.getsize(filename) == size:
+        with open(filename, 'rb') as file_object:
+            data = file_object.read()
+        if len(data) == size:
+            return bytearray(data)
+    table = builder()
+    # The table is written to a temporary file in the same directory and
+    # then renamed over filename, so a process reading the file (such as
+    # another runParallel worker) always sees either no table or all of it.
+    temporary = None
+    try:
+        directory = os.path.dirname(os.path.abspath(filename))
+        with tempfile.NamedTemporaryFile('wb', dir=directory, delete=False) as file_object:
+            temporary = file_object.name
+            file_object.write(table)
+        os.replace(temporary, filename)
+    except OSError:
+        # The table still works without the disk copy; it is just rebuilt
+        # the next time.
+        if temporary is not None and os.path.exists(temporary):
+            os.remove(temporary)
+    return table
+
+
+def getFinalRowsTable():
+    """Returns the final-rows table, loading or building it on first use."""
+    global FINALROWSTABLE
+    if FINALROWSTABLE is None:
+        FINALROWSTABLE = loadTable(FINALROWSFILE, 40320, buildFinalRowsTable)
+    return FINALROWSTABLE
+
+
+def getRowTable(row):
+    """Returns the distance table for row 'first' or 'second', loading or
+    building it on first use."""
+    if row not in ROWTABLES:
+        ROWTABLES[row] = loadTable(ROWFILES[row], 1 << 20,
+                                   lambda: buildRowTable(row))
+    return ROWTABLES[row]
+
+
+def finalRowsTableMove(board):
+    """Returns the optimal next move for the blank (one of UP, DOWN, LEFT,
+    RIGHT) when rows 0 and 1 are done and the blank is in row 2 or 3.
+    Returns None if the board is solved and 'Stop' if the final rows cannot
+    be solved."""
+    state = []
+    for y in (2, 3):
+        for x in range(BOARDWIDTH):
+            tile = board[x][y]
+            state.append(7 if tile == BLANK else tile - 9)
+    code = getFinalRowsTable()[rankPermutation(state)]
+    if code == GOAL:
+        return None
+    elif code == UNREACHABLE:
+        return 'Stop'
+    return MOVECODES[code]
+
+
+def rowTableMove(row, board):
+    """Returns an optimal next move for the blank (one of UP, DOWN, LEFT,
+    RIGHT) towards finishing row 'first' or 'second'.  Returns None if the
+    row is already done and 'Stop' if it cannot be done."""
+    table = getRowTable(row)
+    tilePositions = []
+    for tile in ROWTILES[row]:
+        x, y = getPosition(board, tile)
+        tilePositions.append(y * BOARDWIDTH + x)
+    blankx, blanky = getPosition(board, BLANK)
+    blankPosition = blanky * BOARDWIDTH + blankx
+    distance = table[getRowIndex(tilePositions, blankPosition)]
+    if distance == 0:
+        return None
+    elif distance == UNREACHABLE:
+        return 'Stop'
+    for move in MOVECODES:
+        if move == UP and blanky > ROWTOPS[row]:
+            cell = blankPosition - BOARDWIDTH
+        elif move == DOWN and blanky < BOARDHEIGHT - 1:
+            cell = blankPosition + BOARDWIDTH
+        elif move == LEFT and blankx > 0:
+            cell = blankPosition - 1
+        elif move == RIGHT and blankx < BOARDWIDTH - 1:
+            cell = blankPosition + 1
+        else:
+            continue
+        nextPositions = [blankPosition if p == cell else p
+                         for p in tilePositions]
+        if table[getRowIndex(nextPositions, cell)] == distance - 1:
+            return move
+
+
+def phaseTableMove(phase, board):
+    """Returns the table move for 'phase' ('first', 'second' or 'final',
+    as returned by getPhase in slidePuzzle_algorithm.py)."""
+    if phase == 'final':
+        return finalRowsTableMove(board)
+    return rowTableMove(phase, board)
+
+#############################################################################
+###
+#############################################################################
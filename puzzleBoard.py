@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Greg Schaefer
+
+module name: puzzleBoard.py
+
+module contents (1 class):
+
+    - Board
+
+Released under a GNU GPLv3 license.
+
+"""
+
+#############################################################################
+### puzzleBoard.py COPYRIGHT:
+#############################################################################
+
+# SlidePuzzlePlus, puzzleBoard.py
+# By Greg Schaefer (schae029@gmail.com)
+
+#  Copyright (C) 2020 by Gregory N. Schaefer
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  (License is found in the COPYING.txt file.)
+#    If not, see <https://www.gnu.org/licenses/>.
+
+#############################################################################
+### puzzleBoard.py
+#############################################################################
+
+from constants_and_genFtns import *
+
+#############################################################################
+### Board
+#############################################################################
+
+# A Board behaves like the list-of-columns board used everywhere else
+# (board[x][y], len(board), board == SOLVEDBOARD), so it can be handed to
+# getNextMove and the other solver ftns unchanged.  In addition it keeps an
+# inverse index (tile -> (x, y)) and the packed form of the board, both of
+# which are updated in O(1) by makeMove.  getPosition in
+# constants_and_genFtns uses the index instead of scanning the board.
+#    Only makeMove should change a Board; assigning to board[x][y] directly
+# would leave the index out of date.
+
+class Board:
+    """A list-of-columns board with an O(1) tile position index."""
+
+    def __init__(self, board):
+        # 'board' can be a list of columns, a packed board, or another Board.
+        if isinstance(board, Board):
+            board = board.columns
+        self.positions = {}
+        if isinstance(board, int):
+            # read the columns and the positions straight from the nibbles;
+            # the packed form is already known
+            self.columns = []
+            for x in range(BOARDWIDTH):
+                column = []
+                for y in range(BOARDHEIGHT):
+                    tile = (board >> (4 * (y * BOARDWIDTH + x))) & 0xF or BLANK
+                    column.append(tile)
+                    self.positions[tile] = (x, y)
+                self.columns.append(column)
+            self.packed = board
+            return
+        self.columns = [column[:] for column in board]
+        for x in range(len(self.columns)):
+            for y in range(len(self.columns[0])):
+                self.positions[self.columns[x][y]] = (x, y)
+        self.packed = packBoard(self.columns)
+
+    def __getitem__(self, x):
+        return self.columns[x]
+
+    def __len__(self):
+        return len(self.columns)
+
+    def __iter__(self):
+        return iter(self.columns)
+
+    def __eq__(self, other):
+        if isinstance(other, Board):
+            return self.packed == other.packed
+        elif isinstance(other, int):
+            return self.packed == other
+        return self.columns == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    # A Board changes in place, so it is not hashable; use key() instead.
+    __hash__ = None
+
+    def __repr__(self):
+        return 'Board(' + repr(self.columns) + ')'
+
+    def key(self):
+        """Returns the packed (hashable) form of the board."""
+        return self.packed
+
+    def copy(self):
+        return Board(self)
+
+    def getPosition(self, tileVal):
+        """Returns the (x, y) board coordinates of tileVal."""
+        return self.positions[tileVal]
+
+    def getBlankPosition(self):
+        """Returns the (x, y) board coordinates of the blank."""
+        return self.positions[BLANK]
+
+    def makeMove(self, move, alg_ON=False):
+        """Makes 'move' on the board, updating the position index and the
+        packed board.  The move is not checked for validity.  When alg_ON is
+        True, 'move' is the direction the blank moves; otherwise it is the
+        direction the clicked tile moves."""
+        blankx, blanky = self.positions[BLANK]
+        if not alg_ON:
+            move = oppDirection(move)
+        if move == UP:
+            tilex, tiley = blankx, blanky - 1
+        elif move == DOWN:
+            tilex, tiley = blankx, blanky + 1
+        elif move == LEFT:
+            tilex, tiley = blankx - 1, blanky
+        elif move == RIGHT:
+            tilex, tiley = blankx + 1, blanky
+        tile = self.columns[tilex][tiley]
+        self.columns[blankx][blanky] = tile
+        self.columns[tilex][tiley] = BLANK
+        self.positions[tile] = (blankx, blanky)
+        self.positions[BLANK] = (tilex, tiley)
+        self.packed += ((tile << (4 * (blanky * BOARDWIDTH + blankx))) -
+                        (tile << (4 * (tiley * BOARDWIDTH + tilex))))
+
+#############################################################################
+###
+#############################################################################
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Greg Schaefer
+
+module name: puzzleGenerators.py
+
+module contents (4 ftns):
+
+    - randomBelow
+    - generateScrambles
+    - generateUniformBoards
+    - packScrambles
+
+Released under a GNU GPLv3 license.
+
+"""
+
+#############################################################################
+### puzzleGenerators.py COPYRIGHT:
+#############################################################################
+
+# SlidePuzzlePlus, puzzleGenerators.py
+# By Greg Schaefer (schae029@gmail.com)
+
+#  Copyright (C) 2020 by Gregory N. Schaefer
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  (License is found in the COPYING.txt file.)
+#    If not, see <https://www.gnu.org/licenses/>.
+
+#############################################################################
+### puzzleGenerators.py
+#############################################################################
+
+# Batch puzzle generation with numpy, for building large test corpora.
+# generateNewPuzzle makes one board at a time, with a getRandomMove (and so a
+# getBlankPosition scan) for every slide.  generateScrambles makes K boards
+# at once: a (K, 16) array holds the boards, one row per board and one
+# column per cell (cell = y * BOARDWIDTH + x, 0 for the blank, the same
+# order as a packed board), and every slide is a handful of array operations
+# over all K boards.
+#    The walks are the same as generateNewPuzzle's: each slide is chosen
+# uniformly from the legal moves that do not undo the previous one.  The
+# random numbers are taken straight from the PCG64 bit generator's raw
+# 64-bit output, which numpy keeps fixed for a given seed, rather than from
+# Generator methods, whose algorithms may change between numpy versions.  So
+# a seed gives the same boards on every run and every machine.
+#    A 130-move walk mostly ends near the solved board.  generateUniformBoards
+# is the batch form of getRandomSolvableBoard: every solvable board is
+# equally likely, which gives a truer picture of how hard the puzzle is.
+
+import numpy as np
+from constants_and_genFtns import *
+
+# blank moves are coded by their index in MOVEORDER, with 4 for no move;
+# CELLSTEP is the change in the blank's cell for each of them
+MOVEORDER = (UP, DOWN, LEFT, RIGHT)
+CELLSTEP = np.array([-BOARDWIDTH, BOARDWIDTH, -1, 1])
+
+# For the blank in each cell after each last move: the number of legal moves
+# that do not undo the last move, and those moves (padded with 4).
+LEGALCOUNT = np.zeros((BOARDWIDTH * BOARDHEIGHT, 5), dtype=np.int64)
+LEGALMOVES = np.full((BOARDWIDTH * BOARDHEIGHT, 5, 4), 4, dtype=np.int64)
+for cell in range(BOARDWIDTH * BOARDHEIGHT):
+    x, y = cell % BOARDWIDTH, cell // BOARDWIDTH
+    legal = [y > 0, y < BOARDHEIGHT - 1, x > 0, x < BOARDWIDTH - 1]
+    for last in range(5):
+        moves = [move for move in range(4) if legal[move] and
+                 (last == 4 or MOVEORDER[move] != oppDirection(MOVEORDER[last]))]
+        LEGALCOUNT[cell, last] = len(moves)
+        LEGALMOVES[cell, last, :len(moves)] = moves
+del cell, x, y, legal, last, moves
+
+#############################################################################
+### Helper ftns
+#############################################################################
+
+def randomBelow(bitGenerator, counts):
+    """Returns an array of random ints, entry i in range(counts[i]), using
+    the top 32 bits of one raw draw from bitGenerator per entry."""
+    raw = bitGenerator.random_raw(len(counts)) >> np.uint64(32)
+    return ((raw * counts.astype(np.uint64)) >> np.uint64(32)).astype(np.int64)
+
+#############################################################################
+### Main functions for puzzleGenerators.py
+#############################################################################
+
+def generateScrambles(count, numSlides=130, seed=0):
+    """Returns a (count, 16) uint8 array of boards, each scrambled from the
+    solved board by a random walk of numSlides moves with no immediate
+    reversals.  'seed' is anything numpy.random.SeedSequence accepts (an
+    int, or a list of ints such as [seed, chunkNumber])."""
+    bitGenerator = np.random.PCG64(seed)
+    cellCount = BOARDWIDTH * BOARDHEIGHT
+    boards = np.zeros((count, cellCount), dtype=np.uint8)
+    boards[:, :cellCount - 1] = np.arange(1, cellCount, dtype=np.uint8)
+    rows = np.arange(count)
+    blank = np.full(count, cellCount - 1)
+    lastMove = np.full(count, 4)
+    for i in range(numSlides):
+        # a uniform choice from the legal moves that do not undo the last one
+        choice = randomBelow(bitGenerator, LEGALCOUNT[blank, lastMove])
+        move = LEGALMOVES[blank, lastMove, choice]
+        target = blank + CELLSTEP[move]
+        boards[rows, blank] = boards[rows, target]
+        boards[rows, target] = 0
+        blank = target
+        lastMove = move
+    return boards
+
+
+def generateUniformBoards(count, seed=0):
+    """Returns a (count, 16) uint8 array of boards, as generateScrambles
+    does, drawn uniformly from all of the solvable boards.  Each row is a
+    random shuffle (an argsort of raw random keys); a row that cannot be
+    solved has the tiles in its first two non-blank cells swapped, as in
+    getRandomSolvableBoard."""
+    bitGenerator = np.random.PCG64(seed)
+    cellCount = BOARDWIDTH * BOARDHEIGHT
+    keys = bitGenerator.random_raw(count * cellCount).reshape(count, cellCount)
+    boards = np.argsort(keys, axis=1, kind='stable').astype(np.uint8)
+
+    # The parity of the permutation taking each cell's contents to its goal
+    # cell must match the parity of the blank's distance from its goal cell
+    # (see validate).  The permutation's parity is that of the number of
+    # swaps needed to sort it (cellCount minus its cycles, as in validate),
+    # counted in one pass over the cells, each step putting the right
+    # contents in one cell of every row at once.  Both arrays are cell-major,
+    # [cell, row], and are used flat, with row r's cell c at c * count + r.
+    rows = np.arange(count)
+    goals = np.ascontiguousarray((boards.T - 1) % cellCount, dtype=np.uint8)
+    where = np.empty_like(goals)  # where[goal, row] is the cell holding it
+    where[goals, rows] = np.arange(cellCount, dtype=np.uint8)[:, None]
+    goals, where = goals.ravel(), where.ravel()
+    swaps = np.zeros(count, dtype=np.intp)
+    for cell in range(cellCount):
+        # swap the contents of 'cell' with those of the cell holding the
+        # contents that belong in it ('cell' itself is not looked at again)
+        other = where[cell * count:(cell + 1) * count]
+        moved = goals[cell * count:(cell + 1) * count]
+        swaps += other != cell
+        goals[other.astype(np.intp) * count + rows] = moved
+        where[moved.astype(np.intp) * count + rows] = other
+    blank = np.argmax(boards == 0, axis=1)
+    distance = (BOARDWIDTH - 1 - blank % BOARDWIDTH) + (BOARDHEIGHT - 1 - blank // BOARDWIDTH)
+    unsolvable = np.flatnonzero(swaps % 2 != distance % 2)
+
+    # the first two non-blank cells are 0 and 1, unless the blank is in one
+    # of them, and then 2 and one of 0 and 1
+    first = np.where(blank[unsolvable] == 0, 1, 0)
+    second = np.where(blank[unsolvable] <= 1, 2, 1)
+    firstTiles = boards[unsolvable, first]
+    boards[unsolvable, first] = boards[unsolvable, second]
+    boards[unsolvable, second] = firstTiles
+    return boards
+
+
+def packScrambles(boards):
+    """Returns the packed boards (see packBoard) for the rows of a board
+    array, as a uint64 array.  int(packed) can be passed to Board or to any
+    of the solvers."""
+    shifts = np.arange(0, 4 * boards.shape[1], 4, dtype=np.uint64)
+    return np.bitwise_or.reduce(boards.astype(np.uint64) << shifts, axis=1)
+
+#############################################################################
+###
+#############################################################################
@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Greg Schaefer
+
+module name: resultFiles.py
+
+module contents (4 ftns + 2 classes):
+
+    - ResultWriter
+    - iterResults
+    - summarizeResults
+    - getColumnFiles
+    - ColumnWriter
+    - summarizeColumns
+
+Released under a GNU GPLv3 license.
+
+"""
+
+#############################################################################
+### resultFiles.py COPYRIGHT:
+#############################################################################
+
+# SlidePuzzlePlus, resultFiles.py
+# By Greg Schaefer (schae029@gmail.com)
+
+#  Copyright (C) 2020 by Gregory N. Schaefer
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  (License is found in the COPYING.txt file.)
+#    If not, see <https://www.gnu.org/licenses/>.
+
+#############################################################################
+### resultFiles.py
+#############################################################################
+
+# Results files for spPLUS_TESTING_module.py.  Each board tested is one line
+# of JSON (newline-delimited JSON, or NDJSON):
+#
+#   {"board": 1234..., "clicks": 131, "status": "Solved!", "seconds": 0.0041}
+#
+# where board is the packed board (see packBoard), clicks the number of moves
+# and status the solver's status.  Because every line stands on its own, a
+# second run can simply append to the file, and the file can be read back
+# one line at a time, so neither writing nor summarizing a million-board run
+# needs the results in memory.
+#    The same results can also be written as fixed-width binary columns, one
+# file per column (see getColumnFiles): clicks as uint16, the packed start
+# board as uint64, the status as a uint8 code (STATUSCODES) and the solve
+# time as float32, all in the machine's byte order.  That is 15 bytes per
+# board, and summarizeColumns reads the files through numpy.memmap a block
+# at a time, so the summary of any number of boards takes only a few
+# megabytes.  Writing the columns does not need numpy.
+
+import os
+import json
+from array import array
+from math import sqrt
+from constants_and_genFtns import *
+
+# (column, array typecode, numpy dtype) for the binary column files
+COLUMNS = (('clicks', 'H', 'uint16'), ('board', 'Q', 'uint64'),
+           ('status', 'B', 'uint8'), ('seconds', 'f', 'float32'))
+# status codes for the status column; any other status is OTHERSTATUS
+STATUSCODES = {SOLVED: 0, MOVECAP: 1, 'Stop': 2, None: 3}
+OTHERSTATUS = 255
+
+#############################################################################
+### ResultWriter
+#############################################################################
+
+class ResultWriter:
+    """Appends one line per board to a results file, writing and flushing
+    the lines batchSize at a time.  Use it in a with statement, or call
+    close() when done, so the last batch is written."""
+
+    def __init__(self, filename, batchSize=1000):
+        self.file_object = open(filename, 'a')
+        self.batchSize = batchSize
+        self.lines = []
+
+    def write(self, board, clicks, status, seconds):
+        """Adds the result for one board (a packed board or anything packBoard
+        accepts)."""
+        record = {'board': packBoard(board), 'clicks': clicks,
+                  'status': status, 'seconds': round(seconds, 6)}
+        self.lines.append(json.dumps(record) + '\n')
+        if len(self.lines) >= self.batchSize:
+            self.flush()
+
+    def flush(self):
+        self.file_object.write(''.join(self.lines))
+        self.file_object.flush()
+        self.lines = []
+
+    def close(self):
+        self.flush()
+        self.file_object.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+
+#############################################################################
+### Reading results
+#############################################################################
+
+def iterResults(filename):
+    """Yields the records (dicts with keys board, clicks, status and seconds)
+    in a results file, one at a time."""
+    with open(filename) as file_object:
+        for line in file_object:
+            if line.strip():
+                yield json.loads(line)
+
+
+def summarizeResults(filename):
+    """Returns a dict of summary statistics for a results file, read in one
+    pass: the number of trials, the count of each status, and the minimum,
+    maximum, mean, median and standard deviation of the clicks for the
+    solved boards, plus the mean solve time.  The clicks are counted in a
+    histogram, which is all the median needs, so memory does not grow with
+    the number of boards."""
+    trials = 0
+    statuses = {}
+    histogram = {}
+    totalSeconds = 0.0
+    # Welford's running mean and sum of squared deviations
+    solved = 0
+    mean = 0.0
+    squares = 0.0
+    for record in iterResults(filename):
+        trials += 1
+        totalSeconds += record['seconds']
+        status = record['status']
+        statuses[status] = statuses.get(status, 0) + 1
+        if status != SOLVED:
+            continue
+        clicks = record['clicks']
+        histogram[clicks] = histogram.get(clicks, 0) + 1
+        solved += 1
+        delta = clicks - mean
+        mean += delta / solved
+        squares += delta * (clicks - mean)
+
+    summary = {'trials': trials, 'statuses': statuses,
+               'mean seconds': totalSeconds / trials if trials else None,
+               'minimum': None, 'maximum': None, 'mean': None,
+               'median': None, 'standard deviation': None}
+    if solved:
+        values = sorted(histogram)
+        # the median is the middle value, or the mean of the two middle ones
+        middle = [(solved - 1) // 2, solved // 2]
+        medians = []
+        seen = 0
+        for value in values:
+            seen += histogram[value]
+            while middle and middle[0] < seen:
+                medians.append(value)
+                middle.pop(0)
+        summary.update({'minimum': values[0], 'maximum': values[-1],
+                        'mean': mean, 'median': sum(medians) / 2,
+                        'standard deviation': sqrt(squares / solved)})
+    return summary
+
+#############################################################################
+### Binary column files
+#############################################################################
+
+def getColumnFiles(prefix):
+    """Returns {column: filename} for the column files named after
+    'prefix'."""
+    return {column: prefix + '_' + column + '.bin' for column, typecode, dtype in COLUMNS}
+
+
+class ColumnWriter:
+    """Appends each board's result to the column files named after
+    'prefix', batchSize boards at a time.  It has the same write method as
+    ResultWriter, and like it should be used in a with statement or
+    closed when done."""
+
+    def __init__(self, prefix, batchSize=10000):
+        self.files = getColumnFiles(prefix)
+        self.batchSize = batchSize
+        self.columns = {column: array(typecode) for column, typecode, dtype in COLUMNS}
+
+    def write(self, board, clicks, status, seconds):
+        self.columns['clicks'].append(min(clicks, 0xFFFF))
+        self.columns['board'].append(packBoard(board))
+        self.columns['status'].append(STATUSCODES.get(status, OTHERSTATUS))
+        self.columns['seconds'].append(seconds)
+        if len(self.columns['clicks']) >= self.batchSize:
+            self.flush()
+
+    def flush(self):
+        for column, typecode, dtype in COLUMNS:
+            with open(self.files[column], 'ab') as file_object:
+                self.columns[column].tofile(file_object)
+            self.columns[column] = array(typecode)
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+
+
+def summarizeColumns(prefix, blockSize=1 << 20):
+    """Returns the same summary as summarizeResults for the column files
+    named after 'prefix', plus 'histogram', a numpy array whose entry n is
+    the number of solved boards that took n clicks.  The files are read
+    through numpy.memmap, blockSize boards at a time, and every statistic
+    is taken from the histogram and the status counts, so memory does not
+    grow with the number of boards.  Needs numpy."""
+    import numpy as np
+
+    files = getColumnFiles(prefix)
+    trials = os.path.getsize(files['clicks']) // 2
+    histogram = np.zeros(1 << 16, dtype=np.int64)
+    statusCounts = np.zeros(256, dtype=np.int64)
+    totalSeconds = 0.0
+    if trials:
+        clicks = np.memmap(files['clicks'], dtype=np.uint16, mode='r')
+        status = np.memmap(files['status'], dtype=np.uint8, mode='r')
+        seconds = np.memmap(files['seconds'], dtype=np.float32, mode='r')
+        for start in range(0, trials, blockSize):
+            blockStatus = status[start:start + blockSize]
+            blockClicks = clicks[start:start + blockSize]
+            statusCounts += np.bincount(blockStatus, minlength=256)
+            histogram += np.bincount(blockClicks[blockStatus == STATUSCODES[SOLVED]],
+                                     minlength=1 << 16)
+            totalSeconds += float(seconds[start:start + blockSize].sum(dtype=np.float64))
+
+    codes = {code: status for status, code in STATUSCODES.items()}
+    codes[OTHERSTATUS] = 'other'
+    statuses = {codes[code]: int(statusCounts[code])
+                for code in np.flatnonzero(statusCounts)}
+    summary = {'trials': trials, 'statuses': statuses,
+               'mean seconds': totalSeconds / trials if trials else None,
+               'minimum': None, 'maximum': None, 'mean': None,
+               'median': None, 'standard deviation': None,
+               'histogram': histogram[:0]}
+    solved = int(histogram.sum())
+    if solved:
+        values = np.flatnonzero(histogram)
+        counts = histogram[values]
+        mean = float((values * counts).sum()) / solved
+        variance = float((counts * (values - mean) ** 2).sum()) / solved
+        # the median is the middle value, or the mean of the two middle ones
+        cumulative = np.cumsum(counts)
+        lower = values[np.searchsorted(cumulative, (solved - 1) // 2, 'right')]
+        upper = values[np.searchsorted(cumulative, solved // 2, 'right')]
+        summary.update({'minimum': int(values[0]), 'maximum': int(values[-1]),
+                        'mean': mean, 'median': (int(lower) + int(upper)) / 2,
+                        'standard deviation': sqrt(variance),
+                        'histogram': histogram[:values[-1] + 1]})
+    return summary
+
+#############################################################################
+###
+#############################################################################
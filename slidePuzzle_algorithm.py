@@ -4,9 +4,21 @@
 
 program name: slidePuzzle_algorithm.py
 
-module contents (11 ftns):
+module contents (23 ftns + 1 class):
     
     - getNextMove
+    - getPackedBoard
+    - getPhase
+    - getPhaseMove
+    - firstRowMove
+    - secondRowMove
+    - finalRowsMove
+    - MoveCache (class)
+    - enableMoveCache
+    - disableMoveCache
+    - getMoveCacheStats
+    - iterSolve
+    - solve
     - adjacent4
     - blankCW
     - blankCW02
@@ -54,6 +66,9 @@ from makeAdjacent4 import *
 from order4 import *
 from getTiles import *
 from constants_and_genFtns import *
+from puzzleBoard import *
+from phaseTables import *
+from collections import OrderedDict
 
 ##############################################################################
 # main algorithm
@@ -65,193 +80,423 @@ from constants_and_genFtns import *
 # The value of board[x][y] will be one of 1 - 15 or BLANK (= None).
 # Note that x picks out the column of the board we want to work with, and
 # y picks out the row in that column that we want to work with.
-def getNextMove(board, lastMove, SOLVEDBOARD):
+# 'board' may also be a packed board (see packBoard in constants_and_genFtns).
+# 'tables' is a tuple of the phases (see getPhase) for which the optimal
+# lookup tables in phaseTables.py are used instead of the heuristic logic.
+def getNextMove(board, lastMove, SOLVEDBOARD, tables=()):
     """ Computes the next "best" move for the blank on the given board.  Return
     value is one of UP, DOWN, RIGHT, LEFT."""
     
+    # The helper ftns index the board as board[x][y] and look tiles up with
+    # getPosition, so a packed board is swapped for a Board (see
+    # getPackedBoard).  A Board or a list of columns is used as it is.
+    if isinstance(board, int):
+        board = getPackedBoard(board)
+    SOLVEDBOARD = unpackBoard(SOLVEDBOARD)
+    if MOVECACHE is not None:
+        key = (packBoard(board), lastMove, tables)
+        found, nextMove = MOVECACHE.lookup(key)
+        if found:
+            return nextMove
     blankx, blanky = getPosition(board, BLANK)
+    phase = getPhase(board, blanky)
+    nextMove = getPhaseMove(phase, board, lastMove, SOLVEDBOARD, blankx, blanky,
+                            tables)
+    if MOVECACHE is not None:
+        MOVECACHE.store(key, nextMove)
+    return nextMove
+
+
+# The Board for the packed board getNextMove was last called with.
+PACKEDBOARD = None
+
+
+def getPackedBoard(packed):
+    """Returns a Board holding the packed board 'packed'.  A caller that
+    steps a packed board along one move at a time gets the same Board back
+    each time, moved on with makeMove, so it is built only once per solve
+    rather than once per move."""
+    global PACKEDBOARD
+    board = PACKEDBOARD
+    if board is not None and board.packed != packed:
+        blankx, blanky = board.getBlankPosition()
+        newx, newy = getPackedPosition(packed, BLANK)
+        for move, cell in BLANKMOVES[blanky * BOARDWIDTH + blankx]:
+            if cell == newy * BOARDWIDTH + newx:
+                board.makeMove(move, True)
+                break
+        if board.packed != packed:
+            board = None  # not one move on from the last board
+    if board is None:
+        board = Board(packed)
+        PACKEDBOARD = board
+    return board
+
 
-    # First check to see whether the first Row is completed.
-    firstRowDone = (board[0][0] == 1 and board[1][0] == 2 and board[2][0] == 3
-                    and board[3][0] == 4 and blanky in (1, 2, 3))
+def getPhase(board, blanky, lastPhase=None):
+    """Returns the phase the algorithm is in: 'first' (the first row is not
+    done), 'second' (the second row is not done) or 'final' (only the final
+    two rows remain).  lastPhase is the phase returned for the previous move,
+    if known.  A finished row can only be disturbed by moving the blank into
+    it, so when the blank has stayed below the finished rows lastPhase still
+    holds and the rows need not be checked again."""
+
+    if lastPhase == 'final' and blanky in (2, 3):
+        return 'final'
+    if lastPhase in ('second', 'final') and blanky in (1, 2, 3):
+        firstRowDone = True
+    else:
+        # First check to see whether the first Row is completed.
+        firstRowDone = (board[0][0] == 1 and board[1][0] == 2 and
+                        board[2][0] == 3 and board[3][0] == 4 and
+                        blanky in (1, 2, 3))
+    if not firstRowDone:
+        return 'first'
     secondRowDone = (board[0][1] == 5 and board[1][1] == 6 and
                      board[2][1] == 7 and board[3][1] == 8 and blanky in (2, 3))
-    # if firstRow is not done, see if it is ready:
-    if not firstRowDone:
-        # get locations of 1, 2, 3, and 4
-        T1x, T1y = getPosition(board, 1)
-        T2x, T2y = getPosition(board, 2)
-        T3x, T3y = getPosition(board, 3)
-        T4x, T4y = getPosition(board, 4)
-        topRow, bottomRow = 0, 1
-
-        # General idea for the algorithm: address the most finished states first.
-
-        allTsInPlace1stRow = (blanky <= 1 and T1y <= 1 and T2y <= 1 and
-                              T3y <= 1 and T4y <= 1)
-
-        # If 1-4 and blank are in top two rows, and if we have the correct
-        # order among the tiles, then we are almost done with the first row.
-        # After establishing contiguity, we only need to rotate the firstRow
-        # tiles into their final positions.
-        if allTsInPlace1stRow:
-            # see whether the tiles are correctly ordered:
-            firstRowReady = readyToRotate(T1x, T1y, T2x, T2y, T3x, T3y, T4x, T4y,
-                                          blankx, blanky, topRow, bottomRow)
-            if firstRowReady:
-                # need tiles 1-4 to be separated only by the blank before we
-                # can rotate
-                allAdjacent = adjacent4(T1x, T1y, T2x, T2y, T3x, T3y, T4x, T4y,
-                                        blankx, blanky)
-                if allAdjacent:
-                    # establish whether we move blank CW or counter-CW
-                    if blankCW(T1x, T1y, T2x, T2y, T3x, T3y, T4x, T4y, blankx,
-                               blanky):
-                        nextMove = moveClockwise(blankx, blanky, topRow, bottomRow)
-                        return nextMove
-                    else:
-                        nextMove = continueDirCCW(blankx, blanky, topRow, bottomRow)
-                        return nextMove
-                elif not allAdjacent:
-                    nextMove = makeAdjacent4(T1x, T1y, T2x, T2y, T3x, T3y, T4x,
-                                             T4y, blankx, blanky)
-                    # ensure we don't get caught in an infinite loop:
-                    if nextMove == oppDirection(lastMove):
-                        nextMove = continueDir(lastMove, blankx, blanky,
-                                               topRow, bottomRow)
+    if not secondRowDone:
+        return 'second'
+    return 'final'
+
+
+def getPhaseMove(phase, board, lastMove, SOLVEDBOARD, blankx, blanky,
+                 tables=()):
+    """Returns the next move for the blank, given the phase returned by
+    getPhase."""
+    if phase in tables:
+        return phaseTableMove(phase, board)
+    elif phase == 'first':
+        return firstRowMove(board, lastMove, blankx, blanky)
+    elif phase == 'second':
+        return secondRowMove(board, lastMove, blankx, blanky)
+    else:
+        return finalRowsMove(board, lastMove, SOLVEDBOARD, blankx, blanky)
+
+
+def firstRowMove(board, lastMove, blankx, blanky):
+    """Returns the next move for the blank while the first row is not done."""
+
+    # get locations of 1, 2, 3, and 4
+    T1x, T1y = getPosition(board, 1)
+    T2x, T2y = getPosition(board, 2)
+    T3x, T3y = getPosition(board, 3)
+    T4x, T4y = getPosition(board, 4)
+    topRow, bottomRow = 0, 1
+
+    # General idea for the algorithm: address the most finished states first.
+
+    allTsInPlace1stRow = (blanky <= 1 and T1y <= 1 and T2y <= 1 and
+                          T3y <= 1 and T4y <= 1)
+
+    # If 1-4 and blank are in top two rows, and if we have the correct
+    # order among the tiles, then we are almost done with the first row.
+    # After establishing contiguity, we only need to rotate the firstRow
+    # tiles into their final positions.
+    if allTsInPlace1stRow:
+        # see whether the tiles are correctly ordered:
+        firstRowReady = readyToRotate(T1x, T1y, T2x, T2y, T3x, T3y, T4x, T4y,
+                                      blankx, blanky, topRow, bottomRow)
+        if firstRowReady:
+            # need tiles 1-4 to be separated only by the blank before we
+            # can rotate
+            allAdjacent = adjacent4(T1x, T1y, T2x, T2y, T3x, T3y, T4x, T4y,
+                                    blankx, blanky)
+            if allAdjacent:
+                # establish whether we move blank CW or counter-CW
+                if blankCW(T1x, T1y, T2x, T2y, T3x, T3y, T4x, T4y, blankx,
+                           blanky):
+                    nextMove = moveClockwise(blankx, blanky, topRow, bottomRow)
+                    return nextMove
+                else:
+                    nextMove = continueDirCCW(blankx, blanky, topRow, bottomRow)
                     return nextMove
-            elif not firstRowReady:
-                # We have all of the tiles in the correct rows but they are
-                # out of order.
-                nextMove = order4('first', board)
+            elif not allAdjacent:
+                nextMove = makeAdjacent4(T1x, T1y, T2x, T2y, T3x, T3y, T4x,
+                                         T4y, blankx, blanky)
                 # ensure we don't get caught in an infinite loop:
                 if nextMove == oppDirection(lastMove):
-                    nextMove = continueDir(lastMove, blankx, blanky, topRow,
-                                           bottomRow)
+                    nextMove = continueDir(lastMove, blankx, blanky,
+                                           topRow, bottomRow)
                 return nextMove
-        elif not allTsInPlace1stRow:
-            nextMove = getTiles('first', board, lastMove)
+        elif not firstRowReady:
+            # We have all of the tiles in the correct rows but they are
+            # out of order.
+            nextMove = order4('first', board)
             # ensure we don't get caught in an infinite loop:
             if nextMove == oppDirection(lastMove):
-                nextMove = continueDir(lastMove, blankx, blanky, topRow, bottomRow)
+                nextMove = continueDir(lastMove, blankx, blanky, topRow,
+                                       bottomRow)
             return nextMove
-    elif not secondRowDone:
-        # get locations of 5, 6, 7, and 8
-        T5x, T5y = getPosition(board, 5)
-        T6x, T6y = getPosition(board, 6)
-        T7x, T7y = getPosition(board, 7)
-        T8x, T8y = getPosition(board, 8)
-        topRow, bottomRow = 1, 2
-
-        allTsInPlace2ndRow = (blanky in (1, 2) and T5y in (1, 2) and
-                              T6y in (1, 2) and T7y in (1, 2) and
-                              T8y in (1, 2))
-
-        if allTsInPlace2ndRow:
-            # If 5-8 and blank are in the second and third rows, and if the
-            # tiles are in the correct order, then we are almost done with
-            # the second row; after establishing contiguity, we can rotate the
-            # secondRow tiles into their final positions.
-            # See whether the tiles are correctly ordered:
-            secondRowReady = readyToRotate(T5x, T5y, T6x, T6y, T7x, T7y, T8x, T8y,
-                                           blankx, blanky, topRow, bottomRow)
-            if secondRowReady:
-                # need tiles 5-8 to be separated only by the blank before we
-                # can rotate
-                allAdjacent = adjacent4(T5x, T5y, T6x, T6y, T7x, T7y, T8x, T8y,
-                                        blankx, blanky)
-                if allAdjacent:
-                    # establish whether we move blank CW or counter-CW
-                    if blankCW(T5x, T5y, T6x, T6y, T7x, T7y, T8x, T8y, blankx,
-                               blanky):
-                        nextMove = moveClockwise(blankx, blanky, topRow, bottomRow)
-                        return nextMove
-                    else:
-                        nextMove = continueDirCCW(blankx, blanky, topRow, bottomRow)
-                        return nextMove
-                elif not allAdjacent:
-                    nextMove = makeAdjacent4(T5x, T5y, T6x, T6y, T7x, T7y, T8x,
-                                             T8y, blankx, blanky)
-                    # ensure we don't get caught in an infinite loop:
-                    if nextMove == oppDirection(lastMove):
-                        nextMove = continueDir(lastMove, blankx, blanky,
-                                               topRow, bottomRow)
+    elif not allTsInPlace1stRow:
+        nextMove = getTiles('first', board, lastMove)
+        # ensure we don't get caught in an infinite loop:
+        if nextMove == oppDirection(lastMove):
+            nextMove = continueDir(lastMove, blankx, blanky, topRow, bottomRow)
+        return nextMove
+
+
+def secondRowMove(board, lastMove, blankx, blanky):
+    """Returns the next move for the blank while the second row is not done."""
+
+    # get locations of 5, 6, 7, and 8
+    T5x, T5y = getPosition(board, 5)
+    T6x, T6y = getPosition(board, 6)
+    T7x, T7y = getPosition(board, 7)
+    T8x, T8y = getPosition(board, 8)
+    topRow, bottomRow = 1, 2
+
+    allTsInPlace2ndRow = (blanky in (1, 2) and T5y in (1, 2) and
+                          T6y in (1, 2) and T7y in (1, 2) and
+                          T8y in (1, 2))
+
+    if allTsInPlace2ndRow:
+        # If 5-8 and blank are in the second and third rows, and if the
+        # tiles are in the correct order, then we are almost done with
+        # the second row; after establishing contiguity, we can rotate the
+        # secondRow tiles into their final positions.
+        # See whether the tiles are correctly ordered:
+        secondRowReady = readyToRotate(T5x, T5y, T6x, T6y, T7x, T7y, T8x, T8y,
+                                       blankx, blanky, topRow, bottomRow)
+        if secondRowReady:
+            # need tiles 5-8 to be separated only by the blank before we
+            # can rotate
+            allAdjacent = adjacent4(T5x, T5y, T6x, T6y, T7x, T7y, T8x, T8y,
+                                    blankx, blanky)
+            if allAdjacent:
+                # establish whether we move blank CW or counter-CW
+                if blankCW(T5x, T5y, T6x, T6y, T7x, T7y, T8x, T8y, blankx,
+                           blanky):
+                    nextMove = moveClockwise(blankx, blanky, topRow, bottomRow)
                     return nextMove
-            elif not secondRowReady:
-                # All of the tiles are in the correct rows but they are out of
-                # order.
-                nextMove = order4('second', board)
+                else:
+                    nextMove = continueDirCCW(blankx, blanky, topRow, bottomRow)
+                    return nextMove
+            elif not allAdjacent:
+                nextMove = makeAdjacent4(T5x, T5y, T6x, T6y, T7x, T7y, T8x,
+                                         T8y, blankx, blanky)
                 # ensure we don't get caught in an infinite loop:
                 if nextMove == oppDirection(lastMove):
-                    nextMove = continueDir(lastMove, blankx, blanky, topRow,
-                                           bottomRow)
+                    nextMove = continueDir(lastMove, blankx, blanky,
+                                           topRow, bottomRow)
                 return nextMove
-        elif not allTsInPlace2ndRow:
-            nextMove = getTiles('second', board, lastMove)
+        elif not secondRowReady:
+            # All of the tiles are in the correct rows but they are out of
+            # order.
+            nextMove = order4('second', board)
             # ensure we don't get caught in an infinite loop:
             if nextMove == oppDirection(lastMove):
-                nextMove = continueDir(lastMove, blankx, blanky, topRow, bottomRow)
+                nextMove = continueDir(lastMove, blankx, blanky, topRow,
+                                       bottomRow)
             return nextMove
-    else:
-        # The final two rows remain unfinished.
-        # final steps: order the tiles; then move them into place.
-        # blank is in either row 2 or row 3
-        # get locations of 9-12, 13-15, and blank tile
-        blankx, blanky = getPosition(board, BLANK)
-        T9x, T9y = getPosition(board, 9)
-        T10x, T10y = getPosition(board, 10)
-        T11x, T11y = getPosition(board, 11)
-        T12x, T12y = getPosition(board, 12)
-        T13x, T13y = getPosition(board, 13)
-        T14x, T14y = getPosition(board, 14)
-        T15x, T15y = getPosition(board, 15)
-        topRow, bottomRow = 2, 3
-        
-        finalRowsReady = finalRsReady(T9x, T9y, T10x, T10y, T11x, T11y, T12x,
-                                      T12y, T13x, T13y, T14x, T14y, T15x, T15y,
-                                      blankx, blanky, topRow, bottomRow)
+    elif not allTsInPlace2ndRow:
+        nextMove = getTiles('second', board, lastMove)
+        # ensure we don't get caught in an infinite loop:
+        if nextMove == oppDirection(lastMove):
+            nextMove = continueDir(lastMove, blankx, blanky, topRow, bottomRow)
+        return nextMove
+
 
-        if not finalRowsReady:
-            thirdRowOrdered = readyToRotate(T9x, T9y, T10x, T10y, T11x, T11y,
-                                            T12x, T12y, blankx, blanky, topRow,
-                                            bottomRow)
-            if not thirdRowOrdered:
-                nextMove = order4('third', board)
+def finalRowsMove(board, lastMove, SOLVEDBOARD, blankx, blanky):
+    """Returns the next move for the blank once the first two rows are done."""
+
+    # The final two rows remain unfinished.
+    # final steps: order the tiles; then move them into place.
+    # blank is in either row 2 or row 3
+    # get locations of 9-12 and 13-15
+    T9x, T9y = getPosition(board, 9)
+    T10x, T10y = getPosition(board, 10)
+    T11x, T11y = getPosition(board, 11)
+    T12x, T12y = getPosition(board, 12)
+    T13x, T13y = getPosition(board, 13)
+    T14x, T14y = getPosition(board, 14)
+    T15x, T15y = getPosition(board, 15)
+    topRow, bottomRow = 2, 3
+    
+    finalRowsReady = finalRsReady(T9x, T9y, T10x, T10y, T11x, T11y, T12x,
+                                  T12y, T13x, T13y, T14x, T14y, T15x, T15y,
+                                  blankx, blanky, topRow, bottomRow)
+
+    if not finalRowsReady:
+        thirdRowOrdered = readyToRotate(T9x, T9y, T10x, T10y, T11x, T11y,
+                                        T12x, T12y, blankx, blanky, topRow,
+                                        bottomRow)
+        if not thirdRowOrdered:
+            nextMove = order4('third', board)
+            # ensure we don't get caught in an infinite loop:
+            if nextMove == oppDirection(lastMove):
+                nextMove = continueDir(lastMove, blankx, blanky, topRow,
+                                       bottomRow)
+            return nextMove
+        else:
+            # Since finalRowsReady = False, the last 3 tiles are not yet
+            # ordered and in place relative to the thirdRow tiles.
+            nextMove = moveLast3Ts(T9x, T9y, T10x, T10y, T11x, T11y, T12x,
+                                   T12y, T13x, T13y, T14x, T14y, T15x, T15y,
+                                   blankx, blanky, lastMove)
+            # a check against lastMove is done in moveLast3Ts()
+            return nextMove        
+    # the following check on board is needed so that once the board is
+    # solved, hitting on the COMPUTE MOVE button will do nothing.
+    elif finalRowsReady:
+        if not(board == SOLVEDBOARD):
+            # move blank CW or CCW
+            clockwise= blankCW02(T9x, T9y, blankx, blanky)
+            if clockwise:
+                nextMove = moveClockwise(blankx, blanky, topRow, bottomRow)
                 # ensure we don't get caught in an infinite loop:
                 if nextMove == oppDirection(lastMove):
-                    nextMove = continueDir(lastMove, blankx, blanky, topRow,
-                                           bottomRow)
+                    nextMove = continueDir(lastMove, blankx, blanky,
+                                           topRow, bottomRow)
                 return nextMove
-            else:
-                # Since finalRowsReady = False, the last 3 tiles are not yet
-                # ordered and in place relative to the thirdRow tiles.
-                nextMove = moveLast3Ts(T9x, T9y, T10x, T10y, T11x, T11y, T12x,
-                                       T12y, T13x, T13y, T14x, T14y, T15x, T15y,
-                                       blankx, blanky, lastMove)
-                # a check against lastMove is done in moveLast3Ts()
-                return nextMove        
-        # the following check on board is needed so that once the board is
-        # solved, hitting on the COMPUTE MOVE button will do nothing.
-        elif finalRowsReady:
-            if not(board == SOLVEDBOARD):
-                # move blank CW or CCW
-                clockwise= blankCW02(T9x, T9y, blankx, blanky)
-                if clockwise:
-                    nextMove = moveClockwise(blankx, blanky, topRow, bottomRow)
-                    # ensure we don't get caught in an infinite loop:
-                    if nextMove == oppDirection(lastMove):
-                        nextMove = continueDir(lastMove, blankx, blanky,
-                                               topRow, bottomRow)
-                    return nextMove
-                elif not clockwise:
-                    nextMove = continueDirCCW(blankx, blanky, topRow, bottomRow)
-                    # ensure we don't get caught in an infinite loop:
-                    if nextMove == oppDirection(lastMove):
-                        nextMove = continueDir(lastMove, blankx, blanky,
-                                               topRow, bottomRow)
-                    return nextMove
-            elif board == SOLVEDBOARD:
-                return None
+            elif not clockwise:
+                nextMove = continueDirCCW(blankx, blanky, topRow, bottomRow)
+                # ensure we don't get caught in an infinite loop:
+                if nextMove == oppDirection(lastMove):
+                    nextMove = continueDir(lastMove, blankx, blanky,
+                                           topRow, bottomRow)
+                return nextMove
+        elif board == SOLVEDBOARD:
+            return None
+
+
+##############################################################################
+# decision cache
+##############################################################################
+
+# The decision cache is off unless enableMoveCache is called.  getNextMove's
+# decision depends only on the board, lastMove and the tables in use, so
+# entries are keyed on (packed board, lastMove, tables).  Entries are only
+# valid for one SOLVEDBOARD; call MOVECACHE.clear() before solving towards a
+# different one.
+
+class MoveCache:
+    """Bounded least-recently-used cache of getNextMove decisions, with hit,
+    miss and eviction counters."""
+
+    def __init__(self, capacity=100000):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def lookup(self, key):
+        """Returns (True, move) if key is cached, otherwise (False, None)."""
+        try:
+            nextMove = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            return False, None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return True, nextMove
+
+    def store(self, key, nextMove):
+        self.entries[key] = nextMove
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self):
+        return {'size': len(self.entries), 'capacity': self.capacity,
+                'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions}
+
+
+MOVECACHE = None
+
+
+def enableMoveCache(capacity=100000):
+    """Turns on the decision cache (emptying any existing one) and returns
+    it."""
+    global MOVECACHE
+    MOVECACHE = MoveCache(capacity)
+    return MOVECACHE
+
+
+def disableMoveCache():
+    global MOVECACHE
+    MOVECACHE = None
+
+
+def getMoveCacheStats():
+    """Returns the decision cache's counters, or None if it is off."""
+    if MOVECACHE is None:
+        return None
+    return MOVECACHE.stats()
+
+##############################################################################
+# whole-solution ftns
+##############################################################################
+
+def iterSolve(board, max_moves=360, SOLVEDBOARD=None, tables=()):
+    """Generator which yields the algorithm's moves for 'board' one at a time,
+    without changing 'board'.  The generator's return value (the value of
+    its StopIteration) is the status: SOLVED, MOVECAP if the board is still
+    not solved after max_moves moves, or 'Stop'/None if getNextMove gave up.
+    A board that is malformed or cannot be solved is rejected before any
+    move is made; the status is then the message from validate.
+    max_moves=None removes the cap.  'tables' is as in getNextMove.  The
+    phase is carried from one move to the next, so the finished rows are not
+    re-checked on every move."""
+
+    problem = validate(board, SOLVEDBOARD)
+    if problem:
+        return problem
+    board = Board(board)
+    if SOLVEDBOARD is None:
+        SOLVEDBOARD = SOLVEDPACKED
+    SOLVEDBOARD = Board(SOLVEDBOARD)
+    lastMove = None
+    phase = None
+    clicks = 0
+    while board != SOLVEDBOARD:
+        if max_moves is not None and clicks >= max_moves:
+            return MOVECAP
+        found = False
+        if MOVECACHE is not None:
+            key = (board.key(), lastMove, tables)
+            found, nextMove = MOVECACHE.lookup(key)
+        if found:
+            # getPhase was skipped, so the phase has to be re-derived from
+            # scratch on the next move.
+            phase = None
+        else:
+            blankx, blanky = board.getBlankPosition()
+            phase = getPhase(board, blanky, phase)
+            nextMove = getPhaseMove(phase, board, lastMove, SOLVEDBOARD,
+                                    blankx, blanky, tables)
+            if MOVECACHE is not None:
+                MOVECACHE.store(key, nextMove)
+        if nextMove is None or nextMove == 'Stop':
+            return nextMove
+        board.makeMove(nextMove, True)
+        lastMove = nextMove
+        clicks += 1
+        yield nextMove
+    return SOLVED
+
+
+def solve(board, max_moves=360, SOLVEDBOARD=None, tables=(), stop=None):
+    """Returns (moves, status) where moves is the algorithm's complete list of
+    moves for 'board' and status is as described in iterSolve.  'board' is
+    not changed.  If 'stop' (a threading.Event) is set, the solve ends after
+    the current move and the status is 'Stop'."""
+    moves = []
+    solver = iterSolve(board, max_moves, SOLVEDBOARD, tables)
+    while True:
+        if stop is not None and stop.is_set():
+            return moves, 'Stop'
+        try:
+            moves.append(next(solver))
+        except StopIteration as stop:
+            return moves, stop.value
 
 ##############################################################################
 ### helper ftns
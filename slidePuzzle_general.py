@@ -0,0 +1,339 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Greg Schaefer
+
+program name: slidePuzzle_general.py
+
+module contents (5 ftns + 1 class):
+
+    - getStartingBoardOfSize
+    - isSolvedOfSize
+    - generatePuzzleOfSize
+    - RowByRowSolver
+    - iterSolve
+    - solve
+
+Released under a GNU GPLv3 license.
+
+"""
+
+#############################################################################
+### slidePuzzle_general.py COPYRIGHT:
+#############################################################################
+
+# SlidePuzzlePlus, slidePuzzle_general.py
+# By Greg Schaefer (schae029@gmail.com)
+
+#  Copyright (C) 2020 by Gregory N. Schaefer
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  (License is found in the COPYING.txt file.)
+#    If not, see <https://www.gnu.org/licenses/>.
+
+##############################################################################
+# Row-by-row solver for boards of any size.
+##############################################################################
+
+# slidePuzzle_algorithm.py is written for the 4-by-4 board (tiles 1 - 15, the
+# 'first', 'second' and 'final' phases, blankx == 3 and so on).  This module
+# solves a board of any width and height (at least 2 by 2) with the usual
+# reduction:
+#
+#   - rows 0 to height - 3 are solved one at a time, from the left.  All but
+#     the last two tiles of a row are moved straight to their goal cells.  The
+#     last two are set up one column to the right and one row down and then
+#     turned into place with two moves of the blank.
+#   - the last two rows are then solved the same way, one column at a time,
+#     the roles of rows and columns being swapped.
+#   - the remaining 2-by-2 square is finished by cycling the blank.
+#
+# A tile is moved along a shortest path to its target.  For each step of the
+# path the blank is routed (breadth-first search) to the next cell of the
+# path without passing through the tile or any cell that is already done.
+# In the one arrangement where that is impossible (the second tile of a pair
+# caught in the pair's goal corner) the pair is finished by a breadth-first
+# search over the pair's 2-by-3 corner.  Every tile takes O(width + height)
+# steps, so a board needs O(width * height * (width + height)) moves.
+#    The board is a list of columns (board[x][y], BLANK for the blank) of any
+# size; the goal is the one getStartingBoardOfSize makes.  The moves are blank
+# moves (alg_ON=True in makeMove).  Inside the solver a board is a flat list
+# of cells, cell = y * width + x, with 0 for the blank.
+
+import random
+from collections import deque
+from constants_and_genFtns import *
+
+##############################################################################
+### helper ftns
+##############################################################################
+
+def getStartingBoardOfSize(width, height):
+    """Returns the solved board (a list of columns) of the given size."""
+    board = [[y * width + x + 1 for y in range(height)] for x in range(width)]
+    board[width - 1][height - 1] = BLANK
+    return board
+
+
+def isSolvedOfSize(board):
+    """Returns True if 'board' (a list of columns of any size) is solved."""
+    return board == getStartingBoardOfSize(len(board), len(board[0]))
+
+
+def generatePuzzleOfSize(width, height, numSlides):
+    """Returns a board of the given size scrambled by numSlides random moves,
+    none of which undoes the move before it."""
+    solver = RowByRowSolver(getStartingBoardOfSize(width, height))
+    lastMove = None
+    for i in range(numSlides):
+        blank = solver.positions[0]
+        choices = [(move, cell) for move, cell in solver.getNeighbors(blank)
+                   if move != oppDirection(lastMove)]
+        lastMove, cell = random.choice(choices)
+        solver.moveBlank(cell)
+    return solver.getBoard()
+
+##############################################################################
+### RowByRowSolver
+##############################################################################
+
+class RowByRowSolver:
+    """Solves one board of any size; the moves are collected in self.moves."""
+
+    def __init__(self, board):
+        self.width = len(board)
+        self.height = len(board[0])
+        self.cells = [0] * (self.width * self.height)
+        for x in range(self.width):
+            for y in range(self.height):
+                if board[x][y] != BLANK:
+                    self.cells[y * self.width + x] = board[x][y]
+        # positions[tile] is the cell of 'tile'; positions[0] is the blank's
+        self.positions = [0] * (self.width * self.height)
+        for cell in range(len(self.cells)):
+            self.positions[self.cells[cell]] = cell
+        self.locked = [False] * len(self.cells)  # cells that are done
+        self.moves = []
+
+    def getBoard(self):
+        """Returns the board as a list of columns."""
+        return [[self.cells[y * self.width + x] or BLANK
+                 for y in range(self.height)] for x in range(self.width)]
+
+    def getNeighbors(self, cell):
+        """Returns (move, neighbouring cell) for each neighbour of 'cell'."""
+        x, y = cell % self.width, cell // self.width
+        neighbors = []
+        if y > 0:
+            neighbors.append((UP, cell - self.width))
+        if y < self.height - 1:
+            neighbors.append((DOWN, cell + self.width))
+        if x > 0:
+            neighbors.append((LEFT, cell - 1))
+        if x < self.width - 1:
+            neighbors.append((RIGHT, cell + 1))
+        return neighbors
+
+    def moveBlank(self, cell):
+        """Moves the blank into the neighbouring cell 'cell'."""
+        blank = self.positions[0]
+        tile = self.cells[cell]
+        self.cells[blank], self.cells[cell] = tile, 0
+        self.positions[tile], self.positions[0] = blank, cell
+        if cell == blank - self.width:
+            self.moves.append(UP)
+        elif cell == blank + self.width:
+            self.moves.append(DOWN)
+        elif cell == blank - 1:
+            self.moves.append(LEFT)
+        else:
+            self.moves.append(RIGHT)
+
+    def findPath(self, start, target, avoid=None):
+        """Returns the cells (not including start) of a shortest path from
+        start to target that stays off locked cells and the cell 'avoid', or
+        None if there is no such path."""
+        if start == target:
+            return []
+        previous = {start: None}
+        queue = deque([start])
+        while queue:
+            cell = queue.popleft()
+            for move, nextCell in self.getNeighbors(cell):
+                if (nextCell in previous or self.locked[nextCell] or
+                        nextCell == avoid):
+                    continue
+                previous[nextCell] = cell
+                if nextCell == target:
+                    path = []
+                    while nextCell != start:
+                        path.append(nextCell)
+                        nextCell = previous[nextCell]
+                    path.reverse()
+                    return path
+                queue.append(nextCell)
+        return None
+
+    def routeBlank(self, target, avoid=None):
+        """Moves the blank to 'target' without moving the tile in 'avoid'.
+        Returns False (and does not move) if that is impossible."""
+        path = self.findPath(self.positions[0], target, avoid)
+        if path is None:
+            return False
+        for cell in path:
+            self.moveBlank(cell)
+        return True
+
+    def moveTile(self, tile, target):
+        """Moves 'tile' to the cell 'target' along a shortest path."""
+        path = self.findPath(self.positions[tile], target)
+        for cell in path:
+            if not self.routeBlank(cell, self.positions[tile]):
+                raise ValueError('cannot move the blank past tile ' + str(tile))
+            self.moveBlank(self.positions[tile])
+
+    def solveCorner(self, a, b, goalA, goalB, side):
+        """Puts tiles a and b into goalA and goalB by a breadth-first search
+        over the blank's moves in the 2-by-3 corner made of goalA, goalB and
+        the two cells beyond each of them in the direction 'side'.  a, b and
+        the blank must all be in the corner."""
+        corner = set()
+        for cell in (goalA, goalB):
+            corner.update((cell, cell + side, cell + 2 * side))
+        start = (self.positions[a], self.positions[b], self.positions[0])
+        previous = {start: None}
+        queue = deque([start])
+        while queue:
+            state = queue.popleft()
+            if state[0] == goalA and state[1] == goalB:
+                break
+            posA, posB, blank = state
+            for move, cell in self.getNeighbors(blank):
+                if cell not in corner:
+                    continue
+                nextState = (blank if cell == posA else posA,
+                             blank if cell == posB else posB, cell)
+                if nextState not in previous:
+                    previous[nextState] = state
+                    queue.append(nextState)
+        path = []
+        while previous[state] is not None:
+            path.append(state[2])
+            state = previous[state]
+        for cell in reversed(path):
+            self.moveBlank(cell)
+
+    def placePair(self, a, b, goalA, goalB, side):
+        """Puts the last two tiles a and b of a row (side=width) or of a
+        column of the last two rows (side=1) into goalA and goalB, goalB being
+        the cell at the end of the line.  'side' is the step from the line to
+        the unsolved part of the board."""
+        if self.positions[a] == goalA and self.positions[b] == goalB:
+            self.locked[goalA] = self.locked[goalB] = True
+            return
+        # Park a in b's goal cell and b next to it, on the unsolved side...
+        self.moveTile(a, goalB)
+        self.locked[goalB] = True
+        trapped = (self.positions[b] == goalA or
+                   (self.positions[b] == goalA + side and
+                    self.positions[0] == goalA))
+        if trapped:
+            # b (or the blank) is stuck in goalA, the pocket between a and
+            # the solved cells; finish the pair inside its corner instead.
+            if self.positions[0] != goalA:
+                self.routeBlank(goalA + side, self.positions[b])
+            self.locked[goalB] = False
+            self.solveCorner(a, b, goalA, goalB, side)
+        else:
+            self.moveTile(b, goalB + side)
+            self.locked[goalB + side] = True
+            self.routeBlank(goalA)
+            # ...then the blank turns them into place.
+            self.locked[goalB] = self.locked[goalB + side] = False
+            self.moveBlank(goalB)
+            self.moveBlank(goalB + side)
+        self.locked[goalA] = self.locked[goalB] = True
+
+    def solve(self):
+        """Solves the board.  Returns SOLVED, or 'Stop' if the board cannot
+        be solved."""
+        width, height = self.width, self.height
+        # the rows, top to bottom, down to the last two
+        for y in range(height - 2):
+            for x in range(width - 2):
+                cell = y * width + x
+                self.moveTile(cell + 1, cell)
+                self.locked[cell] = True
+            goalA = y * width + width - 2
+            self.placePair(goalA + 1, goalA + 2, goalA, goalA + 1, width)
+        # the last two rows, left to right, down to the last two columns
+        for x in range(width - 2):
+            goalA = (height - 2) * width + x
+            goalB = goalA + width
+            self.placePair(goalA + 1, goalB + 1, goalA, goalB, 1)
+        # the last 2-by-2 square: the blank goes to the corner and then
+        # around the square, one way or the other
+        corner = height * width - 1
+        self.routeBlank(corner)
+        square = [corner - width, corner - width - 1, corner - 1]
+        tiles = [self.cells[cell] for cell in square]
+        goals = [cell + 1 for cell in square]
+        if tiles != goals:
+            # going around once moves each of the three tiles one cell
+            # along the square, against the blank's direction
+            if tiles[1:] + tiles[:1] == goals:
+                cycle = square + [corner]
+            else:
+                cycle = square[::-1] + [corner]
+            for cell in cycle:
+                self.moveBlank(cell)
+        solved = all(self.cells[cell] == cell + 1 for cell in range(corner))
+        return SOLVED if solved else 'Stop'
+
+##############################################################################
+### solver interface (same as slidePuzzle_algorithm.py)
+##############################################################################
+
+def iterSolve(board, max_moves=None):
+    """Generator which yields the moves that solve 'board' (a list of columns
+    of any size).  The generator's return value is the status: SOLVED,
+    MOVECAP if more than max_moves moves are needed, or the message from
+    validate if the board is malformed or cannot be solved.  The moves are
+    all found before the first is yielded."""
+    moves, status = solve(board, max_moves)
+    for move in moves:
+        yield move
+    return status
+
+
+def solve(board, max_moves=None):
+    """Returns (moves, status) for 'board', as in iterSolve."""
+    try:
+        width, height = len(board), len(board[0])
+    except (TypeError, IndexError):
+        return [], 'Board is not a list of columns'
+    if width < 2 or height < 2:
+        return [], 'Board is smaller than 2 by 2'
+    problem = validate(board, getStartingBoardOfSize(width, height))
+    if problem:
+        return [], problem
+    solver = RowByRowSolver(board)
+    status = solver.solve()
+    if status != SOLVED:
+        return [], status
+    if max_moves is not None and len(solver.moves) > max_moves:
+        return solver.moves[:max_moves], MOVECAP
+    return solver.moves, SOLVED
+
+##############################################################################
+###
+##############################################################################
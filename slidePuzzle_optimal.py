@@ -0,0 +1,322 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Greg Schaefer
+
+program name: slidePuzzle_optimal.py
+
+module contents (10 ftns):
+
+    - getPatternDatabases
+    - getGoalCells
+    - boardToCells
+    - lineConflict
+    - rowConflict
+    - colConflict
+    - idaStar
+    - getNextMove
+    - iterSolve
+    - solve
+
+Released under a GNU GPLv3 license.
+
+"""
+
+#############################################################################
+### slidePuzzle_optimal.py COPYRIGHT:
+#############################################################################
+
+# SlidePuzzlePlus, slidePuzzle_optimal.py
+# By Greg Schaefer (schae029@gmail.com)
+
+#  Copyright (C) 2020 by Gregory N. Schaefer
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  (License is found in the COPYING.txt file.)
+#    If not, see <https://www.gnu.org/licenses/>.
+
+##############################################################################
+# Optimal (fewest moves) solver for the slide puzzle.
+##############################################################################
+
+# This module offers the same interface as slidePuzzle_algorithm.py
+# (getNextMove, iterSolve, solve), but the moves come from an IDA* search, so
+# every solution is as short as possible.  It is used to measure how far the
+# algorithm's solutions are from optimal and for the "Optimal Move" button in
+# slidepuzzle_PLUS.py.
+#    The search works on a flat list of cells, cell = y * BOARDWIDTH + x,
+# holding the tile numbers with 0 for the blank.  The bound is the Manhattan
+# distance plus linear conflicts.  Both are updated incrementally as the
+# blank moves: only the moved tile's Manhattan distance changes, and only the
+# two rows (for a vertical move) or two columns (for a horizontal move) the
+# tile moves between can change their linear conflict.
+#    When the pattern database files have been built and the goal is the
+# usual one, the linear conflict is replaced by the much stronger additive
+# pattern database bound.  It is also updated incrementally: a move changes
+# the index of the moved tile's pattern only, so each node costs one lookup.
+
+from constants_and_genFtns import *
+from puzzleBoard import *
+from patternDatabases import *
+
+# The pattern databases (see patternDatabases.py), loaded on first use; False
+# if they have not been built.
+PATTERNDATABASES = None
+
+# The most recent optimal solution, as {packed board: next move} for every
+# board along it, so that repeated getNextMove calls do not search again.
+PLAN = {}
+
+##############################################################################
+### helper ftns
+##############################################################################
+
+def getPatternDatabases():
+    """Returns the memory-mapped pattern databases, or None if they have not
+    been built (run patternDatabases.py to build them)."""
+    global PATTERNDATABASES
+    if PATTERNDATABASES is None:
+        PATTERNDATABASES = loadPatternDatabases() or False
+    return PATTERNDATABASES or None
+
+
+def getGoalCells(SOLVEDBOARD):
+    """Returns a list giving, for each tile number, its cell on SOLVEDBOARD."""
+    SOLVEDBOARD = unpackBoard(SOLVEDBOARD)
+    goalCells = [0] * (BOARDWIDTH * BOARDHEIGHT)
+    for x in range(BOARDWIDTH):
+        for y in range(BOARDHEIGHT):
+            tile = SOLVEDBOARD[x][y]
+            goalCells[0 if tile == BLANK else tile] = y * BOARDWIDTH + x
+    return goalCells
+
+
+def boardToCells(board):
+    """Returns the flat list of cells (0 for the blank) for 'board'."""
+    board = unpackBoard(board)
+    cells = [0] * (BOARDWIDTH * BOARDHEIGHT)
+    for x in range(BOARDWIDTH):
+        for y in range(BOARDHEIGHT):
+            if board[x][y] != BLANK:
+                cells[y * BOARDWIDTH + x] = board[x][y]
+    return cells
+
+
+def lineConflict(goals):
+    """Returns the linear conflict for one row or column.  'goals' lists, in
+    board order, the goal positions along the line of the tiles which belong
+    in that line.  Each tile that has to leave the line to let the others
+    pass costs 2 extra moves."""
+    n = len(goals)
+    if n < 2:
+        return 0
+    # longest increasing subsequence; the remaining tiles are in conflict
+    longest = [1] * n
+    for i in range(1, n):
+        for j in range(i):
+            if goals[j] < goals[i] and longest[j] + 1 > longest[i]:
+                longest[i] = longest[j] + 1
+    return 2 * (n - max(longest))
+
+
+def rowConflict(cells, goalCells, row):
+    goals = []
+    for x in range(BOARDWIDTH):
+        tile = cells[row * BOARDWIDTH + x]
+        if tile and goalCells[tile] // BOARDWIDTH == row:
+            goals.append(goalCells[tile] % BOARDWIDTH)
+    return lineConflict(goals)
+
+
+def colConflict(cells, goalCells, col):
+    goals = []
+    for y in range(BOARDHEIGHT):
+        tile = cells[y * BOARDWIDTH + col]
+        if tile and goalCells[tile] % BOARDWIDTH == col:
+            goals.append(goalCells[tile] // BOARDWIDTH)
+    return lineConflict(goals)
+
+##############################################################################
+### IDA* search
+##############################################################################
+
+def idaStar(board, SOLVEDBOARD=SOLVEDPACKED, max_moves=None, usePDB=True,
+            stop=None):
+    """Returns a list of blank moves (UP, DOWN, LEFT, RIGHT) which solves
+    'board' in the fewest possible moves.  Returns None if the board cannot
+    be solved within max_moves moves (max_moves=None means no limit), or if
+    'stop' (a threading.Event, checked at every node) is set.  The pattern
+    databases are used when usePDB is True, they have been built and
+    SOLVEDBOARD is the usual goal."""
+
+    cells = boardToCells(board)
+    goalCells = getGoalCells(SOLVEDBOARD)
+    goalX = [cell % BOARDWIDTH for cell in goalCells]
+    goalY = [cell // BOARDWIDTH for cell in goalCells]
+
+    manhattan = 0
+    for cell in range(BOARDWIDTH * BOARDHEIGHT):
+        tile = cells[cell]
+        if tile:
+            manhattan += (abs(cell % BOARDWIDTH - goalX[tile]) +
+                          abs(cell // BOARDWIDTH - goalY[tile]))
+    databases = None
+    if usePDB and packBoard(SOLVEDBOARD) == SOLVEDPACKED:
+        databases = getPatternDatabases()
+    if databases:
+        patternIndex = [getPatternIndex(cells, pattern) for pattern in PARTITION]
+        # the pattern each tile belongs to, and the shift of its nibble
+        patternOf = {}
+        for p in range(len(PARTITION)):
+            for i in range(len(PARTITION[p])):
+                patternOf[PARTITION[p][i]] = (p, 4 * i)
+        extra = sum(2 * getPatternValue(databases[p], patternIndex[p])
+                    for p in range(len(PARTITION)))
+    else:
+        rowLC = [rowConflict(cells, goalCells, row) for row in range(BOARDHEIGHT)]
+        colLC = [colConflict(cells, goalCells, col) for col in range(BOARDWIDTH)]
+        extra = sum(rowLC) + sum(colLC)
+    # [Manhattan distance, linear conflict or pattern database extra]
+    bound = [manhattan, extra]
+    path = []
+    FOUND = -1
+    STOPPED = -2
+
+    def search(blank, g, limit, lastMove):
+        if stop is not None and stop.is_set():
+            return STOPPED
+        h = bound[0] + bound[1]
+        if h == 0:
+            return FOUND
+        f = g + h
+        if f > limit:
+            return f
+        smallest = None
+        for move, cell in BLANKMOVES[blank]:
+            if move == oppDirection(lastMove):
+                continue
+            tile = cells[cell]
+            # the tile moves from 'cell' into 'blank'
+            oldManhattan, oldConflict = bound
+            bound[0] += (abs(blank % BOARDWIDTH - goalX[tile]) +
+                         abs(blank // BOARDWIDTH - goalY[tile]) -
+                         abs(cell % BOARDWIDTH - goalX[tile]) -
+                         abs(cell // BOARDWIDTH - goalY[tile]))
+            cells[blank], cells[cell] = tile, 0
+            if databases:
+                p, shift = patternOf[tile]
+                oldIndex = patternIndex[p]
+                patternIndex[p] = oldIndex + ((blank - cell) << shift)
+                bound[1] += 2 * (getPatternValue(databases[p], patternIndex[p]) -
+                                 getPatternValue(databases[p], oldIndex))
+            elif move in (UP, DOWN):
+                a, b = blank // BOARDWIDTH, cell // BOARDWIDTH
+                oldA, oldB = rowLC[a], rowLC[b]
+                rowLC[a] = rowConflict(cells, goalCells, a)
+                rowLC[b] = rowConflict(cells, goalCells, b)
+                bound[1] += rowLC[a] + rowLC[b] - oldA - oldB
+            else:
+                a, b = blank % BOARDWIDTH, cell % BOARDWIDTH
+                oldA, oldB = colLC[a], colLC[b]
+                colLC[a] = colConflict(cells, goalCells, a)
+                colLC[b] = colConflict(cells, goalCells, b)
+                bound[1] += colLC[a] + colLC[b] - oldA - oldB
+            path.append(move)
+
+            result = search(cell, g + 1, limit, move)
+            if result == FOUND or result == STOPPED:
+                return result
+
+            path.pop()
+            cells[cell], cells[blank] = tile, 0
+            if databases:
+                patternIndex[p] = oldIndex
+            elif move in (UP, DOWN):
+                rowLC[a], rowLC[b] = oldA, oldB
+            else:
+                colLC[a], colLC[b] = oldA, oldB
+            bound[0], bound[1] = oldManhattan, oldConflict
+            if smallest is None or result < smallest:
+                smallest = result
+        return smallest
+
+    blank = cells.index(0)
+    limit = bound[0] + bound[1]
+    while True:
+        if max_moves is not None and limit > max_moves:
+            return None
+        result = search(blank, 0, limit, None)
+        if result == FOUND:
+            return path
+        if result is None or result == STOPPED:
+            return None
+        limit = result
+
+##############################################################################
+### solver interface (same as slidePuzzle_algorithm.py)
+##############################################################################
+
+def getNextMove(board, lastMove, SOLVEDBOARD):
+    """Returns the next move of an optimal solution for 'board' (one of UP,
+    DOWN, LEFT, RIGHT), or None if the board is solved.  lastMove is accepted
+    for compatibility with slidePuzzle_algorithm.getNextMove; it is not
+    needed because the search never undoes a move."""
+    global PLAN
+    key = packBoard(board)
+    if key == packBoard(SOLVEDBOARD):
+        return None
+    if key not in PLAN:
+        # the search would never end for a board that cannot be solved
+        if validate(board, SOLVEDBOARD):
+            return 'Stop'
+        moves = idaStar(board, SOLVEDBOARD)
+        if moves is None:
+            return 'Stop'
+        PLAN = {}
+        for move in moves:
+            PLAN[key] = move
+            key = makePackedMove(key, move, True)
+        key = packBoard(board)
+    return PLAN[key]
+
+
+def iterSolve(board, max_moves=None, SOLVEDBOARD=SOLVEDPACKED):
+    """Generator which yields the moves of an optimal solution for 'board'.
+    The generator's return value is the status: SOLVED, MOVECAP if the
+    optimal solution is longer than max_moves, or the message from validate
+    if the board is malformed or cannot be solved.  The whole search is done
+    before the first move is yielded."""
+    moves, status = solve(board, max_moves, SOLVEDBOARD)
+    if status != SOLVED:
+        return status
+    for move in moves:
+        yield move
+    return SOLVED
+
+
+def solve(board, max_moves=None, SOLVEDBOARD=SOLVEDPACKED, stop=None):
+    """Returns (moves, status) for an optimal solution, as in iterSolve.  If
+    'stop' (a threading.Event) is set during the search, the search ends and
+    the status is 'Stop'."""
+    problem = validate(board, SOLVEDBOARD)
+    if problem:
+        return [], problem
+    moves = idaStar(board, SOLVEDBOARD, max_moves, stop=stop)
+    if moves is None:
+        if stop is not None and stop.is_set():
+            return [], 'Stop'
+        return [], MOVECAP
+    return moves, SOLVED
+
+##############################################################################
+###
+##############################################################################
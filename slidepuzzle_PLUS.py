@@ -48,7 +48,7 @@
 #   - drawBoard
 #   - slideAnimation (with modifications by Greg Schaefer)
 #   - generateNewPuzzle
-#   - resetAnimation 
+#   - resetAnimation (with modifications by Greg Schaefer)
 
 
 # In this file, functions written by Greg Schaefer include:
@@ -56,6 +56,22 @@
 #   - updateClickCountSurf
 #   - updateTimeSurf
 #   - getGameScore
+#   - shuffleEffect
+#   - makeTileSurfaces
+#   - drawHudText
+#   - updateDirtyRects
+#   - Layout
+#   - setLayout
+#   - makeButtons
+#   - startSolver
+#   - stopSolvers
+#   - solveInBackground
+#   - updateComputerScoreSurf
+#   - getTilePosition
+#   - drawBoardTiles
+#   - advanceAnimations
+#   - getCellRect
+#   - drawChangedCells
 
 # slidepuzzle_PLUS imports the following modules, all authored by Greg Schaefer:
 
@@ -64,28 +80,58 @@
 #   - order4.py
 #   - getTiles.py
 #   - slidePuzzle_algorithm.py
+#   - puzzleBoard.py
+#   - slidePuzzle_optimal.py
+#   - peepholeOptimizer.py
 
 ##############################################################################
 ###
 ##############################################################################
 
-import pygame, sys, random, os
+import pygame, sys, random, os, threading
+from collections import deque
 from constants_and_genFtns import *
 from makeAdjacent4 import *
 from order4 import *
 from getTiles import *
 from slidePuzzle_algorithm import *
+from puzzleBoard import *
+from peepholeOptimizer import *
+import slidePuzzle_optimal
 from pygame.locals import *
 from datetime import datetime
 
 
+# The window opens at WINDOWWIDTH by WINDOWHEIGHT and can be resized; the
+# sizes and positions here are for that size, and Layout scales them.
 TILESIZE = 80
 # WINDOWWIDTH = 640  # original size
 WINDOWWIDTH = 700
 # WINDOWHEIGHT = 480  # original size
 WINDOWHEIGHT = 525
-FPS = 40
+FPS = 40  # highest frame rate of the animations; main itself waits for events
+SLIDETIME = 0.25  # seconds a tile takes to slide into the blank's cell
+# The arrow keys and WASD slide the tile next to the blank in that direction.
+# Key presses wait in a queue of at most MAXQUEUEDKEYS moves (any more are
+# ignored) and are played one slide at a time, each slide taking
+# SLIDETIME / (1 + the number of moves still waiting).
+MOVEKEYS = {K_UP: UP, K_w: UP, K_DOWN: DOWN, K_s: DOWN,
+            K_LEFT: LEFT, K_a: LEFT, K_RIGHT: RIGHT, K_d: RIGHT}
+MAXQUEUEDKEYS = 10
+CLOCKTICK = USEREVENT  # posted once a second to update the countdown clock
+SOLUTIONREADY = USEREVENT + 1  # posted by the solver thread (see startSolver)
 TIMEPERGAME = 160  # time is in seconds (default will be 130 seconds)
+# If True, new puzzles are drawn uniformly from all solvable boards instead
+# of being scrambled by 130 random slides (see generateNewPuzzle).
+UNIFORMPUZZLES = False
+# New puzzles are scrambled off-screen and shown in one redraw.  If
+# SHUFFLEEFFECT is more than 0, the scramble is shown instead as a quick
+# shuffle lasting at most SHUFFLEEFFECT seconds (see generateNewPuzzle).
+SHUFFLEEFFECT = 0
+# Reset puts back the board saved when the puzzle was made, in one redraw.
+# If RESETEFFECT is more than 0, the moves are first shown being undone in
+# at most RESETEFFECT seconds (see resetAnimation).
+RESETEFFECT = 0
 
 #                 R    G    B
 BLACK =         (  0,   0,   0)
@@ -106,33 +152,109 @@ BUTTONTEXTCOLOR = BLACK
 MESSAGECOLOR = WHITE
 
 LEFT_OFFSET = 70
-XMARGIN = int((WINDOWWIDTH - (TILESIZE * BOARDWIDTH + (BOARDWIDTH - 1))) / 2) + 40
-YMARGIN = int((WINDOWHEIGHT - (TILESIZE * BOARDHEIGHT + (BOARDHEIGHT - 1))) / 2)
+# Pre-rendered tile surfaces, {tile number: Surface}, made by
+# makeTileSurfaces.  TILESURFSKEY records the size, colors and font they
+# were made with, so drawTile makes them again after any of those change.
+TILESURFS = {}
+TILESURFSKEY = None
+# Dirty-rectangle rendering: whatever draws on DISPLAYSURF adds the areas it
+# changed to DIRTYRECTS, and updateDirtyRects passes only those areas to
+# pygame.display.update.  HUDTEXT holds the text now shown for the click
+# count and the timer, {name: (text, Surface, Rect)}, so each is rendered
+# only when its value changes.  DRAWNSCREEN is the (packed board, message)
+# last drawn, so main redraws the window only when the message changes, and
+# only the changed cells when just the board has (see drawChangedCells).
+DIRTYRECTS = []
+HUDTEXT = {}
+DRAWNSCREEN = None
+# The tiles that are sliding, {tile number: ((left, top), start, slideTime)}:
+# each is drawn moving from the pixel (left, top) to its cell on the board
+# over slideTime seconds from pygame.time.get_ticks() == start (see
+# slideAnimation and advanceAnimations).
+TWEENS = {}
+LAYOUT = None  # the Layout for the current window size (see setLayout)
+
+
+class Layout:
+    """The sizes and positions of everything in a window of the given size,
+    worked out once per window size.  The design is for a WINDOWWIDTH by
+    WINDOWHEIGHT window; any other size scales it to fit."""
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.scale = min(width / WINDOWWIDTH, height / WINDOWHEIGHT)
+        scale = self.scale
+        self.tileSize = max(1, int(TILESIZE * scale))
+        self.basicFontSize = max(1, int(BASICFONTSIZE * scale))
+        self.smallFontSize = max(1, int(SMALLFONTSIZE * scale))
+        xMargin = int((width - (self.tileSize * BOARDWIDTH + (BOARDWIDTH - 1))) / 2) + int(40 * scale)
+        yMargin = int((height - (self.tileSize * BOARDHEIGHT + (BOARDHEIGHT - 1))) / 2)
+        # Tiles are tileSize pixels with a 1 pixel gap between them, so the
+        # left of column x is boardLeft + x * (tileSize + 1), and likewise
+        # for the rows.
+        self.boardLeft = xMargin + int(LEFT_OFFSET * scale) - 1
+        self.boardTop = yMargin - 1
+        self.tileLefts = [self.boardLeft + x * (self.tileSize + 1) for x in range(BOARDWIDTH)]
+        self.tileTops = [self.boardTop + y * (self.tileSize + 1) for y in range(BOARDHEIGHT)]
+        # the top left of the HUD text and of the buttons
+        hudLeft = self.boardLeft - int((210 + LEFT_OFFSET) * scale)
+        self.hudPositions = {'time': (hudLeft, self.boardTop - int(50 * scale)),
+                             'clicks': (hudLeft, self.boardTop - int(20 * scale)),
+                             'score': (hudLeft, self.boardTop + int(15 * scale)),
+                             'computer': (hudLeft, self.boardTop + int(45 * scale))}
+        self.buttonPositions = {
+            'auto': (width - int(460 * scale), height - int(70 * scale)),
+            'reset': (width - int(120 * scale), height - int(70 * scale)),
+            'new': (width - int(120 * scale), height - int(40 * scale)),
+            'alg': (width - int(300 * scale), height - int(70 * scale)),
+            'opt': (width - int(300 * scale), height - int(40 * scale))}
+
+    def getSpot(self, x, y):
+        """Returns the board coordinates of the tile at pixel (x, y), or
+        (None, None) if there is no tile there."""
+        tileX, offsetX = divmod(x - self.boardLeft, self.tileSize + 1)
+        tileY, offsetY = divmod(y - self.boardTop, self.tileSize + 1)
+        if (0 <= tileX < BOARDWIDTH and 0 <= tileY < BOARDHEIGHT and
+                offsetX < self.tileSize and offsetY < self.tileSize):
+            return (tileX, tileY)
+        return (None, None)
 
 
 def main():
-    global FPSCLOCK, DISPLAYSURF, BASICFONT, RESET_SURF, RESET_RECT, NEW_SURF
-    global NEW_RECT, SMALLFONT, ALG_SURF, ALG_RECT
+    global FPSCLOCK, DISPLAYSURF
 
     pygame.init()
     FPSCLOCK = pygame.time.Clock()
-    DISPLAYSURF = pygame.display.set_mode((WINDOWWIDTH, WINDOWHEIGHT))
+    DISPLAYSURF = pygame.display.set_mode((WINDOWWIDTH, WINDOWHEIGHT), RESIZABLE)
     pygame.display.set_caption('Slide Puzzle +')
-    BASICFONT = pygame.font.Font('freesansbold.ttf', BASICFONTSIZE)
-    SMALLFONT = pygame.font.SysFont('timesnewroman', SMALLFONTSIZE)
-
-    # Store the option buttons and their rectangles.
-    RESET_SURF, RESET_RECT = makeText('Reset',    TEXTCOLOR, TILECOLOR, WINDOWWIDTH - 120, WINDOWHEIGHT - 70)
-    NEW_SURF,   NEW_RECT   = makeText('New Game', TEXTCOLOR, TILECOLOR, WINDOWWIDTH - 120, WINDOWHEIGHT - 40)
-
-    # Create button for the computer to play.
-    ALG_SURF, ALG_RECT = makeText('Compute Move', TEXTCOLOR, TILECOLOR, WINDOWWIDTH - 300, WINDOWHEIGHT - 70)
-
-    mainBoard, solutionSeq = generateNewPuzzle(130)
+    # work out the layout and render the fonts, buttons and tiles once, up front
+    setLayout(WINDOWWIDTH, WINDOWHEIGHT)
+    # main sleeps in pygame.event.wait between events, so keep mouse motion
+    # (which nothing uses) from waking it
+    pygame.event.set_blocked(MOUSEMOTION)
+
+    mainBoard, solutionSeq = generateNewPuzzle(130, UNIFORMPUZZLES)
+    # The whole solutions are worked out by solver threads (see
+    # startSolver): the algorithm's, starting with the puzzle's own board, so
+    # its click count can be shown at once and Auto Solve can play it, and
+    # the optimal solver's for Optimal Move.
+    solutions = {}  # (packed board, engine) -> (moves, status, score)
+    # (packed board, engine) -> the threading.Event that stops its solver
+    # thread, for the solves still running
+    solving = {}
+    startSolver(mainBoard, solving)
+    autoSolve = False  # True while Auto Solve is playing the solution
+    optimalMove = False  # True while Optimal Move waits for its solution
+    moveQueue = deque()  # the moves Auto Solve has still to play
+    keyQueue = deque()  # the moves from the keyboard still to play
     # A solved board is the same as the board in a start state, prior to any
     # scrambling of the tiles (which is done in generateNewPuzzle).
-    SOLVEDBOARD = getStartingBoard()
+    SOLVEDBOARD = Board(getStartingBoard())
     allMoves = []  # list of moves made from the solved configuration
+    # the same moves, all as blank moves, for scoring the computer's play
+    blankMoves = []
+    startBoard = packBoard(mainBoard)  # the board the moves are made from; Reset restores it
     clicks = 0  # Keep track of the number of moves made
 
     # start countdown clock
@@ -148,44 +270,102 @@ def main():
 
     while True:  # main game loop
         slideTo = None  # the direction, if any, a tile should slide
+        slideTime = SLIDETIME  # and how long the slide takes
         msg = 'Click tile or press arrow keys to slide.'  # msg for upper left corner.
         if mainBoard == SOLVEDBOARD:
             msg = SOLVED
             if calcFinalScore:
                 FinalScoreTextSurf, FinalScoreTextRect = getGameScore(clicks, time_remaining,
-                                                                      timedOutFlag, alg_ON)
+                                                                      timedOutFlag, alg_ON,
+                                                                      startBoard, blankMoves)
                 calcFinalScore = False
 
-        drawBoard(mainBoard, msg)
-        updateClickCountSurf(clicks)  # blits the tile move count to the screen
-        # updateTimeSurf also blits to the screen
+        # updateTimeSurf blits the time remaining to the screen when it changes
+        startingClock = time_flag == 'OFF'
         clock_start, time_remaining, time_flag, prev_time = updateTimeSurf(time_flag, clock_start,
                                                                            prev_time, msg, timedOutFlag)
+        if startingClock:
+            # (re)start the 1 Hz CLOCKTICK with the countdown, so each tick
+            # comes just after the time remaining drops by a second
+            pygame.time.set_timer(CLOCKTICK, 1000)
 
         if time_remaining <= 0 and not alg_ON:
             msg = 'Your time is up!  Try again?'
             timedOutFlag = True
-            drawBoard(mainBoard, msg)
-            updateClickCountSurf(clicks)  # blits the tile move count to the screen
             if calcFinalScore:
                 FinalScoreTextSurf, FinalScoreTextRect = getGameScore(clicks, time_remaining,
-                                                                      timedOutFlag, alg_ON)
+                                                                      timedOutFlag, alg_ON,
+                                                                      startBoard, blankMoves)
                 calcFinalScore = False
-        # the Final Score line is displayed only if we timed out or if the
-        # puzzle was solved.
-        if msg == SOLVED or timedOutFlag:
-            DISPLAYSURF.blit(FinalScoreTextSurf, FinalScoreTextRect)
 
-        checkForQuit()
-        for event in pygame.event.get():  # event handling loop
-            if event.type == MOUSEBUTTONUP:
+        # redraw the whole window only if the message has changed, and only
+        # the cells a move changed if just the board has
+        if DRAWNSCREEN is None or msg != DRAWNSCREEN[1]:
+            drawBoard(mainBoard, msg)
+            # the Final Score line is displayed only if we timed out or if the
+            # puzzle was solved.
+            if msg == SOLVED or timedOutFlag:
+                DISPLAYSURF.blit(FinalScoreTextSurf, FinalScoreTextRect)
+        elif packBoard(mainBoard) != DRAWNSCREEN[0]:
+            drawChangedCells(mainBoard)
+        updateClickCountSurf(clicks)  # blits the tile move count when it changes
+        updateComputerScoreSurf(solutions.get((startBoard, solve)))
+        animating = advanceAnimations(mainBoard)  # draws the sliding tiles
+        updateDirtyRects()
+
+        # Sleep until something happens: a click, a key, a resize, a
+        # solution from the solver thread or the clock's once a second
+        # CLOCKTICK (which needs no handling here; the next pass through the
+        # loop updates the clock).  While tiles are sliding or there are
+        # queued moves to play, take whatever events there are, at most FPS
+        # times a second.
+        if animating or moveQueue or keyQueue:
+            FPSCLOCK.tick(FPS)
+            events = pygame.event.get()
+        else:
+            events = [pygame.event.wait()] + pygame.event.get()
+        checkForQuit(events)
+        for event in events:  # event handling loop
+            if event.type == SOLUTIONREADY:
+                # keep the solution only if it is for this puzzle
+                key = (event.board, event.engine)
+                if key in solving:
+                    del solving[key]
+                    solutions[key] = (event.moves, event.status, event.score)
+            elif event.type == VIDEOEXPOSE:
+                pygame.display.update()  # the window was uncovered
+            elif event.type == VIDEORESIZE:
+                # lay the window out again at the new size; the next pass
+                # through the loop redraws it, rendering the final score
+                # again if it is shown
+                DISPLAYSURF = pygame.display.set_mode((event.w, event.h), RESIZABLE)
+                setLayout(event.w, event.h)
+                TWEENS.clear()  # their pixels are for the old size
+                calcFinalScore = True
+            elif event.type == KEYDOWN:
+                # queue the move, even if a tile is still sliding; it is
+                # checked when its turn comes
+                move = MOVEKEYS.get(event.key)
+                if move is not None and len(keyQueue) < MAXQUEUEDKEYS:
+                    keyQueue.append(move)
+            elif event.type == MOUSEBUTTONUP:
                 spotx, spoty = getSpotClicked(mainBoard, event.pos[0], event.pos[1])
 
                 if (spotx, spoty) == (None, None):
                     # check if the user clicked on an option button
                     if RESET_RECT.collidepoint(event.pos):
-                        resetAnimation(mainBoard, allMoves, alg_ON)  # clicked on Reset button
+                        # only the puzzle's own solution is still wanted
+                        stopSolvers(solving, [(startBoard, solve)])
+                        autoSolve = False
+                        optimalMove = False
+                        moveQueue.clear()
+                        keyQueue.clear()
+                        TWEENS.clear()
+                        if RESETEFFECT > 0:  # clicked on Reset button
+                            resetAnimation(startBoard, blankMoves)
+                        mainBoard = Board(startBoard)
                         allMoves = []
+                        blankMoves = []
                         clicks = 0
                         clock_start = datetime.now()
                         time_flag = 'OFF'
@@ -194,8 +374,18 @@ def main():
                         alg_ON = False
                         lastMove = None
                     elif NEW_RECT.collidepoint(event.pos):
-                        mainBoard, solutionSeq = generateNewPuzzle(130)  # clicked on New Game button
+                        TWEENS.clear()
+                        keyQueue.clear()
+                        mainBoard, solutionSeq = generateNewPuzzle(130, UNIFORMPUZZLES)  # clicked on New Game button
+                        solutions.clear()
+                        stopSolvers(solving)
+                        startSolver(mainBoard, solving)
+                        autoSolve = False
+                        optimalMove = False
+                        moveQueue.clear()
                         allMoves = []
+                        blankMoves = []
+                        startBoard = packBoard(mainBoard)
                         clicks = 0
                         clock_start = datetime.now()
                         time_flag = 'OFF'
@@ -207,7 +397,40 @@ def main():
                         # run computer algorithm one move at a time; send it
                         # the previous move so that we do not repeat it
                         alg_ON = True
+                        autoSolve = False
+                        optimalMove = False
+                        moveQueue.clear()
+                        stopSolvers(solving, [(startBoard, solve)])
                         slideTo = getNextMove(mainBoard, lastMove, SOLVEDBOARD)
+                    elif OPT_RECT.collidepoint(event.pos):  # clicked on Optimal Move button
+                        # same as Compute Move, but each move comes from an
+                        # optimal (fewest moves) solution.  The search can
+                        # take many seconds, so a solver thread does it and
+                        # the move is played when the solution is ready.
+                        alg_ON = True
+                        autoSolve = False
+                        moveQueue.clear()
+                        key = (packBoard(mainBoard), slidePuzzle_optimal.solve)
+                        stopSolvers(solving, [key, (startBoard, solve)])
+                        if msg != SOLVED:
+                            optimalMove = True
+                            if key not in solutions:
+                                startSolver(mainBoard, solving, slidePuzzle_optimal.solve)
+                    elif AUTO_RECT.collidepoint(event.pos):  # clicked on Auto Solve button
+                        # play the algorithm's whole solution from here, or
+                        # stop if it is already playing
+                        if autoSolve:
+                            autoSolve = False
+                            moveQueue.clear()
+                        elif msg != SOLVED:
+                            alg_ON = True
+                            autoSolve = True
+                            optimalMove = False
+                            moveQueue.clear()
+                            key = (packBoard(mainBoard), solve)
+                            stopSolvers(solving, [key, (startBoard, solve)])
+                            if key not in solutions:
+                                startSolver(mainBoard, solving)
                 elif not timedOutFlag and msg != SOLVED and not alg_ON:
                     # check if the clicked tile was next to the blank spot
                     blankx, blanky = getBlankPosition(mainBoard)
@@ -220,34 +443,72 @@ def main():
                     elif spotx == blankx and spoty == blanky - 1:
                         slideTo = DOWN
 
+        # The keyboard's moves are played one slide at a time, and faster
+        # the more of them are waiting.  A move that cannot be made now (the
+        # blank is at the edge, or the game is over) is dropped.
+        if keyQueue and not slideTo and not TWEENS:
+            move = keyQueue.popleft()
+            if (not timedOutFlag and msg != SOLVED and not alg_ON and
+                    isValidMove(mainBoard, move)):
+                slideTo = move
+                slideTime = SLIDETIME / (1 + len(keyQueue))
+
+        # Auto Solve takes its moves from the queue, once the solver thread
+        # has filled it, starting each when the last one has finished sliding.
+        if autoSolve and not moveQueue:
+            solution = solutions.get((packBoard(mainBoard), solve))
+            if solution is not None:
+                moveQueue.extend(solution[0])
+                autoSolve = bool(moveQueue)
+        # Optimal Move queues the first move of the optimal solution.  The
+        # rest of it is an optimal solution for the board that move leads
+        # to, so it is kept for the next click.
+        if optimalMove and not moveQueue:
+            packed = packBoard(mainBoard)
+            solution = solutions.get((packed, slidePuzzle_optimal.solve))
+            if solution is not None:
+                optimalMove = False
+                moves, status, score = solution
+                if moves:
+                    moveQueue.append(moves[0])
+                    packed = makePackedMove(packed, moves[0], True)
+                    solutions[(packed, slidePuzzle_optimal.solve)] = (moves[1:], status, score)
+        if moveQueue and not slideTo and not TWEENS:
+            slideTo = moveQueue.popleft()
+            autoSolve = bool(moveQueue)
+
         # When the computer is not making a move, slideTo has a value only
         # if player has neither timed out nor solved the puzzle.
         if slideTo and slideTo != 'Stop':
             lastMove = slideTo
-            animationSpeed = 8
-            slideAnimation(mainBoard,
-                           slideTo, 'Click tile or press arrow keys to slide.',
-                           animationSpeed, alg_ON)  # show slide on screen
+            # start the slide on screen; the move itself is made at once, so
+            # the next click need not wait for the slide to finish
+            slideAnimation(mainBoard, slideTo, alg_ON, slideTime)
             makeMove(mainBoard, slideTo, alg_ON)
             allMoves.append(slideTo) # record the slide
+            blankMoves.append(slideTo if alg_ON else oppDirection(slideTo))
             clicks += 1
 
-        pygame.display.update()
-        FPSCLOCK.tick(FPS)
-
 
 def terminate():
     pygame.quit()
     sys.exit()
 
 
-def checkForQuit():
-    for event in pygame.event.get(QUIT):  # get all the QUIT events
-        terminate()  # terminate if any QUIT events are present
-    for event in pygame.event.get(KEYUP):  # get all the KEYUP events
-        if event.key == K_ESCAPE:
+def checkForQuit(events=None):
+    # Terminate on a QUIT event or the Esc key.  main passes in the events
+    # it has just taken off the queue.  During an animation (no events),
+    # only the QUIT events are taken off the queue and the Esc key is
+    # checked directly, so the other events wait, in order, for main.
+    if events is None:
+        if pygame.event.get(QUIT) or pygame.key.get_pressed()[K_ESCAPE]:
+            terminate()
+        return
+    for event in events:
+        if event.type == QUIT:
+            terminate()  # terminate if any QUIT events are present
+        if event.type == KEYUP and event.key == K_ESCAPE:
             terminate()  # terminate if the KEYUP event was for the Esc key
-        pygame.event.post(event)  # put the other KEYUP event objects back
 
 
 def getStartingBoard():
@@ -270,6 +531,10 @@ def getStartingBoard():
 
 def getBlankPosition(board):
     # Return the x and y of board coordinates of the blank space.
+    if isinstance(board, int):
+        return getPackedPosition(board, BLANK)
+    if isinstance(board, Board):
+        return board.getBlankPosition()
     for x in range(BOARDWIDTH):
         for y in range(BOARDHEIGHT):
             if board[x][y] == BLANK:
@@ -278,6 +543,13 @@ def getBlankPosition(board):
 
 def makeMove(board, move, alg_ON=False):
     # This function does not check if the move is valid.
+    # A packed board (an int) cannot be changed in place, so the moved packed
+    # board is returned instead; list boards are still changed in place.
+    if isinstance(board, int):
+        return makePackedMove(board, move, alg_ON)
+    if isinstance(board, Board):
+        board.makeMove(move, alg_ON)
+        return
     blankx, blanky = getBlankPosition(board)
 
     # gns: the tile the player clicks on is what is moving up, down, left, or right
@@ -330,31 +602,69 @@ def getRandomMove(board, lastMove=None):
 
 
 def getLeftTopOfTile(tileX, tileY):
-    left = XMARGIN + (tileX * TILESIZE) + (tileX - 1) + LEFT_OFFSET
-    top = YMARGIN + (tileY * TILESIZE) + (tileY - 1)
-    return (left, top)
+    return (LAYOUT.tileLefts[tileX], LAYOUT.tileTops[tileY])
 
 
 def getSpotClicked(board, x, y):
     # from the x & y pixel coordinates, get the x & y board coordinates
-    for tileX in range(len(board)):
-        for tileY in range(len(board[0])):
-            left, top = getLeftTopOfTile(tileX, tileY)
-            tileRect = pygame.Rect(left, top, TILESIZE, TILESIZE)
-            if tileRect.collidepoint(x, y):
-                return (tileX, tileY)
-    return (None, None)
+    return LAYOUT.getSpot(x, y)
 
 
 def drawTile(tilex, tiley, number, adjx=0, adjy=0):
     # draw a tile at board coordinates tilex and tiley, optionally a few
     # pixels over (determined by adjx and adjy)
+    if TILESURFSKEY != (LAYOUT.tileSize, TILECOLOR, TEXTCOLOR, BASICFONT):
+        makeTileSurfaces()
     left, top = getLeftTopOfTile(tilex, tiley)
-    pygame.draw.rect(DISPLAYSURF, TILECOLOR, (left + adjx, top + adjy, TILESIZE, TILESIZE))
-    textSurf = BASICFONT.render(str(number), True, TEXTCOLOR)
-    textRect = textSurf.get_rect()
-    textRect.center = left + int(TILESIZE / 2) + adjx, top + int(TILESIZE / 2) + adjy
-    DISPLAYSURF.blit(textSurf, textRect)
+    DISPLAYSURF.blit(TILESURFS[number], (left + adjx, top + adjy))
+
+
+def makeTileSurfaces():
+    # Render every tile (its square and its number) once, so that drawTile
+    # only has to blit it.  Called from drawTile whenever the tile size, the
+    # tile colors or the font have changed since the tiles were last rendered.
+    global TILESURFS, TILESURFSKEY
+    tileSize = LAYOUT.tileSize
+    TILESURFS = {}
+    for number in range(1, BOARDWIDTH * BOARDHEIGHT):
+        tileSurf = pygame.Surface((tileSize, tileSize)).convert()
+        tileSurf.fill(TILECOLOR)
+        textSurf = BASICFONT.render(str(number), True, TEXTCOLOR)
+        textRect = textSurf.get_rect()
+        textRect.center = int(tileSize / 2), int(tileSize / 2)
+        tileSurf.blit(textSurf, textRect)
+        TILESURFS[number] = tileSurf
+    TILESURFSKEY = (tileSize, TILECOLOR, TEXTCOLOR, BASICFONT)
+
+
+def setLayout(width, height):
+    # Make the Layout for a width by height window, and render again what
+    # depends on its scale: the fonts, the buttons, the tiles and the HUD
+    # text.  Called once at startup and once for each VIDEORESIZE event.
+    global LAYOUT, BASICFONT, SMALLFONT, DRAWNSCREEN
+    LAYOUT = Layout(width, height)
+    BASICFONT = pygame.font.Font('freesansbold.ttf', LAYOUT.basicFontSize)
+    SMALLFONT = pygame.font.SysFont('timesnewroman', LAYOUT.smallFontSize)
+    makeButtons()
+    makeTileSurfaces()
+    HUDTEXT.clear()  # drawHudText renders it again at the new size
+    DRAWNSCREEN = None  # the whole window needs drawing
+
+
+def makeButtons():
+    # Store the option buttons and their rectangles.
+    global RESET_SURF, RESET_RECT, NEW_SURF, NEW_RECT
+    global ALG_SURF, ALG_RECT, OPT_SURF, OPT_RECT, AUTO_SURF, AUTO_RECT
+    positions = LAYOUT.buttonPositions
+    RESET_SURF, RESET_RECT = makeText('Reset',    TEXTCOLOR, TILECOLOR, *positions['reset'])
+    NEW_SURF,   NEW_RECT   = makeText('New Game', TEXTCOLOR, TILECOLOR, *positions['new'])
+
+    # Create button for the computer to play.
+    ALG_SURF, ALG_RECT = makeText('Compute Move', TEXTCOLOR, TILECOLOR, *positions['alg'])
+    # Create button for the computer to play optimally (fewest moves).
+    OPT_SURF, OPT_RECT = makeText('Optimal Move', TEXTCOLOR, TILECOLOR, *positions['opt'])
+    # Create button for the computer to play its whole solution.
+    AUTO_SURF, AUTO_RECT = makeText('Auto Solve', TEXTCOLOR, TILECOLOR, *positions['auto'])
 
 
 def makeText(text, color, bgcolor, top, left):
@@ -365,13 +675,91 @@ def makeText(text, color, bgcolor, top, left):
     return (textSurf, textRect)
 
 
-def updateClickCountSurf(clicks):
-    text = 'Tiles Clicked: ' + str(clicks)
+def drawHudText(name, text, topleft):
+    # Blit the HUD text 'name' ('clicks' or 'time') at topleft.  The text is
+    # rendered, and its area marked dirty, only if it differs from what is
+    # already on the screen; drawBoard blits the current HUD text again
+    # whenever it redraws the whole window.
+    if name in HUDTEXT:
+        oldText, textSurf, textRect = HUDTEXT[name]
+        if oldText == text and textRect.topleft == topleft:
+            return
+        pygame.draw.rect(DISPLAYSURF, BGCOLOR, textRect)  # erase the old text
+        DIRTYRECTS.append(textRect)
     textSurf = SMALLFONT.render(text, True, TEXTCOLOR, BGCOLOR)
     textRect = textSurf.get_rect()
-    left, top = getLeftTopOfTile(0, 0)
-    textRect.topleft = (left - (210 + LEFT_OFFSET), top - 20)
+    textRect.topleft = topleft
     DISPLAYSURF.blit(textSurf, textRect)
+    DIRTYRECTS.append(textRect)
+    HUDTEXT[name] = (text, textSurf, textRect)
+
+
+def updateDirtyRects():
+    # push the areas of DISPLAYSURF changed since the last update to the screen
+    pygame.display.update(DIRTYRECTS)
+    del DIRTYRECTS[:]
+
+
+def startSolver(board, solving, engine=solve):
+    # Start a thread working out the whole solution for 'board' (see
+    # solveInBackground), unless one is already working on it.  'engine' is
+    # the solve ftn to use: the algorithm's (the default) or
+    # slidePuzzle_optimal.solve.  'solving' is main's dict of the
+    # (packed board, engine)s being solved, each with the threading.Event
+    # that stops its thread (see stopSolvers).
+    packed = packBoard(board)
+    if (packed, engine) in solving:
+        return
+    stop = threading.Event()
+    solving[(packed, engine)] = stop
+    thread = threading.Thread(target=solveInBackground, args=(packed, engine, stop))
+    thread.daemon = True  # do not keep the game open when main quits
+    thread.start()
+
+
+def stopSolvers(solving, keep=()):
+    # Stop the solver threads working on solutions that are no longer
+    # wanted, all but those for the (packed board, engine)s in 'keep', so
+    # that they do not go on competing with main for the interpreter.
+    for key in list(solving):
+        if key not in keep:
+            solving.pop(key).set()
+
+
+def solveInBackground(packed, engine, stop):
+    # Runs in the solver thread: solve the packed board with 'engine',
+    # capped at 360 moves as in the test harness, and post the moves (blank
+    # moves), the status and the score they would get (after the peephole
+    # optimizer, as in getGameScore) to main as a SOLUTIONREADY event.  The
+    # engine gives up as soon as 'stop' is set, and nothing is posted.
+    moves, status = engine(packed, 360, stop=stop)
+    if stop.is_set():
+        return
+    if status != SOLVED:
+        score = None
+    elif engine is slidePuzzle_optimal.solve:
+        score = len(moves)  # an optimal solution cannot be shortened
+    else:
+        score = len(optimizeMoves(packed, moves))
+    pygame.event.post(pygame.event.Event(SOLUTIONREADY, board=packed, engine=engine,
+                                         moves=moves, status=status, score=score))
+
+
+def updateComputerScoreSurf(solution):
+    # 'solution' is the solver thread's (moves, status, score) for the
+    # puzzle, or None until it is ready
+    if solution is None:
+        text = 'Computer score: . . .'
+    elif solution[1] != SOLVED:
+        text = 'Computer score: ' + str(solution[1])  # e.g. MOVECAP
+    else:
+        text = 'Computer score: ' + str(solution[2])
+    drawHudText('computer', text, LAYOUT.hudPositions['computer'])
+
+
+def updateClickCountSurf(clicks):
+    text = 'Tiles Clicked: ' + str(clicks)
+    drawHudText('clicks', text, LAYOUT.hudPositions['clicks'])
 
 
 def updateTimeSurf(time_flag, start, prev_tdelta, msg, timedOutFlag):
@@ -390,15 +778,12 @@ def updateTimeSurf(time_flag, start, prev_tdelta, msg, timedOutFlag):
 
     time_remaining = TIMEPERGAME - prev_tdelta.seconds
     text = 'Time remaining: ' + str(time_remaining) + ' secs'
-    textSurf = SMALLFONT.render(text, True, TEXTCOLOR, BGCOLOR)
-    textRect = textSurf.get_rect()
-    left, top = getLeftTopOfTile(0, 0)
-    textRect.topleft = (left - (210 + LEFT_OFFSET), top - 50)
-    DISPLAYSURF.blit(textSurf, textRect)
+    drawHudText('time', text, LAYOUT.hudPositions['time'])
     return start, time_remaining, time_flag, prev_tdelta
 
 
-def getGameScore(clicks, time_remaining, timedOutFlag, alg_ON):
+def getGameScore(clicks, time_remaining, timedOutFlag, alg_ON,
+                 startBoard=None, blankMoves=None):
     if not alg_ON:
         final_score = (TIMEPERGAME - time_remaining) + clicks
         if timedOutFlag:
@@ -410,135 +795,215 @@ def getGameScore(clicks, time_remaining, timedOutFlag, alg_ON):
             final_score = 3 * (TIMEPERGAME + 50)
     elif alg_ON:
         final_score = clicks
+        # The computer is scored on its moves after the peephole optimizer
+        # has taken out the detours (see peepholeOptimizer.py).
+        if blankMoves is not None:
+            final_score = len(optimizeMoves(startBoard, blankMoves))
     text = 'FINAL SCORE: ' + str(final_score)
     textSurf = SMALLFONT.render(text, True, TEXTCOLOR, BGCOLOR)
     textRect = textSurf.get_rect()
-    left, top = getLeftTopOfTile(0, 0)
-    textRect.topleft = (left - (210 + LEFT_OFFSET), top + 15)
+    textRect.topleft = LAYOUT.hudPositions['score']
     return textSurf, textRect
 
 
 def drawBoard(board, message):
+    global DRAWNSCREEN
     DISPLAYSURF.fill(BGCOLOR)
     if message:
         textSurf, textRect = makeText(message, MESSAGECOLOR, BGCOLOR, 5, 5)
         DISPLAYSURF.blit(textSurf, textRect)
 
-    for tilex in range(len(board)):
-        for tiley in range(len(board[0])):
-            if board[tilex][tiley]:
-                drawTile(tilex, tiley, board[tilex][tiley])
-
-    left, top = getLeftTopOfTile(0, 0)
-    width = BOARDWIDTH * TILESIZE
-    height = BOARDHEIGHT * TILESIZE
-    pygame.draw.rect(DISPLAYSURF, BORDERCOLOR, (left - 5, top - 5, width + 11, height + 11), 4)
+    drawBoardTiles(board, pygame.time.get_ticks())
 
     DISPLAYSURF.blit(RESET_SURF, RESET_RECT)
     DISPLAYSURF.blit(NEW_SURF, NEW_RECT)
     DISPLAYSURF.blit(ALG_SURF, ALG_RECT)
+    DISPLAYSURF.blit(OPT_SURF, OPT_RECT)
+    DISPLAYSURF.blit(AUTO_SURF, AUTO_RECT)
 
+    for text, textSurf, textRect in HUDTEXT.values():
+        DISPLAYSURF.blit(textSurf, textRect)
+    DIRTYRECTS.append(DISPLAYSURF.get_rect())
+    DRAWNSCREEN = (packBoard(board), message)
 
-def slideAnimation(board, direction, message, animationSpeed, alg_ON=False):
-    # This function does not check if the move is valid.
-    blankx, blanky = getBlankPosition(board)
-    if not alg_ON:
-        if direction == UP:
-            movex = blankx
-            movey = blanky + 1
-        elif direction == DOWN:
-            movex = blankx
-            movey = blanky - 1
-        elif direction == LEFT:
-            movex = blankx + 1
-            movey = blanky
-        elif direction == RIGHT:
-            movex = blankx - 1
-            movey = blanky
-    elif alg_ON:
-        if direction == UP:
-            movex = blankx
-            movey = blanky - 1
-        elif direction == DOWN:
-            movex = blankx
-            movey = blanky + 1
-        elif direction == LEFT:
-            movex = blankx - 1
-            movey = blanky
-        elif direction == RIGHT:
-            movex = blankx + 1
-            movey = blanky
-
-    # prepare the base surface
-    drawBoard(board, message)
-    baseSurf = DISPLAYSURF.copy()
-    # draw a blank space over the moving tile on the baseSurf Surface.
-    moveLeft, moveTop = getLeftTopOfTile(movex, movey)
-    pygame.draw.rect(baseSurf, BGCOLOR, (moveLeft, moveTop, TILESIZE, TILESIZE))
-
-    for i in range(0, TILESIZE, animationSpeed):
-        # animate the tile sliding over
-        checkForQuit()
-        DISPLAYSURF.blit(baseSurf, (0, 0))
-        if not alg_ON:
-            if direction == UP:
-                drawTile(movex, movey, board[movex][movey], 0, -i)
-            if direction == DOWN:
-                drawTile(movex, movey, board[movex][movey], 0, i)
-            if direction == LEFT:
-                drawTile(movex, movey, board[movex][movey], -i, 0)
-            if direction == RIGHT:
-                drawTile(movex, movey, board[movex][movey], i, 0)
-        elif alg_ON:
-            if direction == UP:
-                drawTile(movex, movey, board[movex][movey], 0, i)
-            if direction == DOWN:
-                drawTile(movex, movey, board[movex][movey], 0, -i)
-            if direction == LEFT:
-                drawTile(movex, movey, board[movex][movey], i, 0)
-            if direction == RIGHT:
-                drawTile(movex, movey, board[movex][movey], -i, 0)
-
-        pygame.display.update()
-        FPSCLOCK.tick(FPS)
 
+def drawBoardTiles(board, now, area=None):
+    # Draw the tiles and the border around them, with each tile in TWEENS
+    # where it is part way along its slide at time 'now' (in ms, from
+    # pygame.time.get_ticks), and mark the board's area dirty.  If 'area'
+    # (a Rect) is given, only the part of the board inside it is drawn and
+    # marked dirty.
+    left, top = getLeftTopOfTile(0, 0)
+    width = BOARDWIDTH * LAYOUT.tileSize
+    height = BOARDHEIGHT * LAYOUT.tileSize
+    borderRect = pygame.Rect(left - 5, top - 5, width + 11, height + 11)
+    if area is None:
+        area = borderRect
+    DISPLAYSURF.set_clip(area)  # so nothing outside 'area' is touched
+    DISPLAYSURF.fill(BGCOLOR, area)
+
+    tileSize = LAYOUT.tileSize
+    for tilex in range(len(board)):
+        for tiley in range(len(board[0])):
+            number = board[tilex][tiley]
+            if number:
+                tileLeft, tileTop = getTilePosition(number, tilex, tiley, now)
+                if area.colliderect((tileLeft, tileTop, tileSize, tileSize)):
+                    cellLeft, cellTop = getLeftTopOfTile(tilex, tiley)
+                    drawTile(tilex, tiley, number, tileLeft - cellLeft, tileTop - cellTop)
+
+    # the border goes on last, as the last column of tiles reaches its inner edge
+    pygame.draw.rect(DISPLAYSURF, BORDERCOLOR, borderRect, 4)
+    DISPLAYSURF.set_clip(None)
+    DIRTYRECTS.append(area)
 
-def generateNewPuzzle(numSlides):
-    # From a starting configuration, make numSlides number of moves (and
-    # animate these moves).
+
+def getCellRect(tilex, tiley):
+    # Return the Rect of the cell at board coordinates tilex and tiley.
+    left, top = getLeftTopOfTile(tilex, tiley)
+    return pygame.Rect(left, top, LAYOUT.tileSize, LAYOUT.tileSize)
+
+
+def drawChangedCells(board):
+    # Redraw only the cells whose tiles differ from those last drawn (see
+    # DRAWNSCREEN); after a move these are its source and destination cells.
+    global DRAWNSCREEN
+    drawnPacked, message = DRAWNSCREEN
+    packed = packBoard(board)
+    area = None
+    for tilex in range(BOARDWIDTH):
+        for tiley in range(BOARDHEIGHT):
+            if getPackedTile(packed, tilex, tiley) != getPackedTile(drawnPacked, tilex, tiley):
+                cellRect = getCellRect(tilex, tiley)
+                area = cellRect if area is None else area.union(cellRect)
+    if area is not None:
+        drawBoardTiles(board, pygame.time.get_ticks(), area)
+    DRAWNSCREEN = (packed, message)
+
+
+def getTilePosition(number, tilex, tiley, now):
+    # Return the pixel left and top at which tile 'number', whose cell is
+    # (tilex, tiley), is drawn at time 'now': its cell's, unless it is
+    # sliding into the cell (see TWEENS).
+    left, top = getLeftTopOfTile(tilex, tiley)
+    if number in TWEENS:
+        (fromLeft, fromTop), start, slideTime = TWEENS[number]
+        fraction = min(1.0, (now - start) / (slideTime * 1000))
+        left = int(round(fromLeft + (left - fromLeft) * fraction))
+        top = int(round(fromTop + (top - fromTop) * fraction))
+    return left, top
+
+
+def slideAnimation(board, direction, alg_ON=False, slideTime=SLIDETIME):
+    # Start the slide of the tile that makeMove(board, direction, alg_ON)
+    # is about to move.  Nothing is drawn here: main calls advanceAnimations
+    # on every pass, which draws the tile where it should be at that moment
+    # until slideTime seconds have passed, however many frames that takes.
+    # A tile that is still sliding starts again from where it is now.
+    # This function does not check if the move is valid.
+    blankx, blanky = getBlankPosition(board)
+    if alg_ON:
+        # the computer's move is the blank's; the tile moves the other way
+        direction = oppDirection(direction)
+    if direction == UP:
+        movex, movey = blankx, blanky + 1
+    elif direction == DOWN:
+        movex, movey = blankx, blanky - 1
+    elif direction == LEFT:
+        movex, movey = blankx + 1, blanky
+    elif direction == RIGHT:
+        movex, movey = blankx - 1, blanky
+    number = board[movex][movey]
+    now = pygame.time.get_ticks()
+    TWEENS[number] = (getTilePosition(number, movex, movey, now), now, slideTime)
+
+
+def advanceAnimations(board):
+    # Draw the sliding tiles for this frame and drop the slides that have
+    # finished (after drawing them in their cells).  Only the area each
+    # slide covers, from where it started to the tile's cell, is redrawn.
+    # Returns True if any tiles are still sliding.
+    if not TWEENS:
+        return False
+    now = pygame.time.get_ticks()
+    tileSize = LAYOUT.tileSize
+    for number, ((fromLeft, fromTop), start, slideTime) in list(TWEENS.items()):
+        area = getCellRect(*board.getPosition(number))
+        area.union_ip((fromLeft, fromTop, tileSize, tileSize))
+        drawBoardTiles(board, now, area)
+    for number in list(TWEENS):
+        start, slideTime = TWEENS[number][1:]
+        if now - start >= slideTime * 1000:
+            del TWEENS[number]
+    return bool(TWEENS)
+
+
+def generateNewPuzzle(numSlides, uniform=False):
+    # From a starting configuration, make numSlides number of moves.  The
+    # moves are made off-screen (no slideAnimation for each one), so a new
+    # puzzle takes a single redraw, or at most SHUFFLEEFFECT seconds when
+    # the shuffle effect is on.
+    # With uniform=True the board is instead drawn uniformly from all of the
+    # solvable boards (see getRandomSolvableBoard); numSlides is ignored and
+    # the sequence of moves is empty.
     sequence = []
-    board = getStartingBoard()
+    if uniform:
+        board = Board(getRandomSolvableBoard())
+    else:
+        board = Board(getStartingBoard())
+        lastMove = None
+        for i in range(numSlides):
+            move = getRandomMove(board, lastMove)
+            makeMove(board, move)
+            sequence.append(move)
+            lastMove = move
+    if SHUFFLEEFFECT > 0:
+        shuffleEffect(sequence)
     drawBoard(board, '')  # 2nd argument is for msg
-    pygame.display.update()
-    pygame.time.wait(500) # pause 500 milliseconds for effect
-    lastMove = None
-    for i in range(numSlides):
-        move = getRandomMove(board, lastMove)
-        slideAnimation(board, move, 'Generating new puzzle . . .',
-                       animationSpeed=int(TILESIZE / 3))
-        makeMove(board, move)
-        sequence.append(move)
-        lastMove = move
+    updateDirtyRects()
     return (board, sequence)
 
 
-def resetAnimation(board, allMoves, alg_ON=False):
-    # make all of the moves in allMoves in reverse.
-    revAllMoves = allMoves[:] # gets a copy of the list
-    revAllMoves.reverse()
-
-    for move in revAllMoves:
-        if move == UP:
-            oppositeMove = DOWN
-        elif move == DOWN:
-            oppositeMove = UP
-        elif move == RIGHT:
-            oppositeMove = LEFT
-        elif move == LEFT:
-            oppositeMove = RIGHT
-        animationSpeed = int(TILESIZE / 2)
-        slideAnimation(board, oppositeMove, '', animationSpeed, alg_ON)
-        makeMove(board, oppositeMove, alg_ON)
+def shuffleEffect(sequence):
+    # Show the scramble in 'sequence' as a quick shuffle: the moves are
+    # replayed from the solved board a few at a time, one frame per group, so
+    # the whole effect takes at most SHUFFLEEFFECT seconds however many moves
+    # there are.  With no moves (a uniform puzzle), the tiles are simply
+    # shown in random orders.
+    frames = max(1, int(SHUFFLEEFFECT * FPS))
+    board = Board(getStartingBoard())
+    if sequence:
+        movesPerFrame = -(-len(sequence) // frames)  # rounded up
+        for start in range(0, len(sequence), movesPerFrame):
+            for move in sequence[start:start + movesPerFrame]:
+                makeMove(board, move)
+            drawBoard(board, 'Generating new puzzle . . .')
+            updateDirtyRects()
+            FPSCLOCK.tick(FPS)
+    else:
+        for frame in range(frames):
+            drawBoard(Board(getRandomSolvableBoard()), 'Generating new puzzle . . .')
+            updateDirtyRects()
+            FPSCLOCK.tick(FPS)
+
+
+def resetAnimation(startBoard, blankMoves):
+    # Show the moves in blankMoves being undone, back to the packed board
+    # startBoard, in at most RESETEFFECT seconds.  Rather than a slide for
+    # each move, every frame shows the board a few moves further back, so a
+    # long game takes no longer to reset than a short one.  The boards are
+    # packed boards, one per move (see getPackedStates), of which only the
+    # ones shown are unpacked.
+    if not blankMoves:
+        return  # nothing to undo
+    frames = max(1, int(RESETEFFECT * FPS))
+    states = getPackedStates(startBoard, blankMoves)
+    movesPerFrame = -(-len(blankMoves) // frames)  # rounded up
+    for i in range(len(blankMoves) - movesPerFrame, 0, -movesPerFrame):
+        checkForQuit()
+        drawBoard(Board(states[i]), '')
+        updateDirtyRects()
+        FPSCLOCK.tick(FPS)
 
 
 if __name__ == '__main__':
@@ -50,74 +50,213 @@
 import pdb
 import json
 import sys, random, os
+import multiprocessing
 from constants_and_genFtns import *
 from makeAdjacent4 import *
 from order4 import *
 from getTiles import *
 from slidePuzzle_algorithm import *
+from puzzleBoard import *
+from peepholeOptimizer import *
+from resultFiles import *
+from puzzleGenerators import *
+import slidePuzzle_optimal
+import slidePuzzle_general
 from datetime import datetime
 
 
-def main():
-    
+def main(uniform=False, optimize=True):
+    # uniform=True tests boards drawn uniformly from all solvable boards
+    # instead of 130-move scrambles (see generateNewPuzzle).  The clicks
+    # recorded are those left after the peephole optimizer
+    # (peepholeOptimizer.py); optimize=False records the algorithm's own
+    # clicks instead, which saves about 6 ms a board for quick runs.
     filepath = ''
     filename = 'sp_problemBoards.json'
     badout = filepath + filename
-    datafile = filepath + 'sp_allTestResults.json'
+    # one line of JSON per board, and the same results as binary columns
+    # (see resultFiles.py)
+    datafile = filepath + 'sp_allTestResults.ndjson'
+    columnPrefix = filepath + 'sp_allTestResults'
 
     # A solved board is the same as the board in a start state, prior to any
     # scrambling of the tiles (which is done in generateNewPuzzle).
-    SOLVEDBOARD = getStartingBoard()
-    alg_ON = True
+    SOLVEDBOARD = Board(getStartingBoard())
+    # Cache the algorithm's decisions; near-solved states recur across boards.
+    enableMoveCache(200000)
 
     boardsToTest = 250000
     n = 0
     problem = False
     # testResults = []
     testBoards = []
-    results = []
 
-    while n < boardsToTest and not problem:  # OUTER LOOP
-        mainBoard, solutionSeq = generateNewPuzzle(130)   # New Game
-        newBoard = str(mainBoard[:])
-        # testBoards.append(newBoard)
-        clicks = 0
-        lastMove = None
-            
-        msg = 'Click tile or press arrow keys to slide.'
-
-        while msg != SOLVED and not problem:  # INNER LOOP
-            slideTo = None
-            if mainBoard == SOLVEDBOARD:
-                msg = SOLVED
-                results.append(clicks)
+    # Each board's result is written to datafile as soon as it is known (in
+    # batches), so the results are never all held in memory.
+    with ResultWriter(datafile) as writer, ColumnWriter(columnPrefix) as columns:
+        while n < boardsToTest and not problem:  # OUTER LOOP
+            mainBoard, solutionSeq = generateNewPuzzle(130, uniform)   # New Game
+            newBoard = str(mainBoard[:])
+            # testBoards.append(newBoard)
+
+            # solve returns every move the algorithm makes for this board; a
+            # status other than SOLVED means the algorithm needed more than
+            # 360 clicks or returned None or 'Stop'.
+            solveStart = datetime.now()
+            moves, status = solve(mainBoard, 360, SOLVEDBOARD)
+            seconds = (datetime.now() - solveStart).total_seconds()
+            clicks = len(moves)
+            resultClicks = len(optimizeMoves(mainBoard, moves)) if optimize else clicks
+            writer.write(mainBoard, resultClicks, status, seconds)
+            columns.write(mainBoard, resultClicks, status, seconds)
+            if status == SOLVED:
                 if clicks > 250:
                     testBoards.append(newBoard)
                     testBoards.append(str(clicks))
-                        
-            if msg != SOLVED:
-                slideTo = getNextMove(mainBoard, lastMove, SOLVEDBOARD)
-
-            if slideTo and slideTo != 'Stop':
-                lastMove = slideTo
-                makeMove(mainBoard, slideTo, alg_ON)
-                clicks += 1
-            if clicks > 360 or (slideTo is None and msg != SOLVED) or slideTo == 'Stop':
+            else:
                 problem = True
                 # testResults.append({newBoard: clicks})
-                results.append(clicks)
-            ### END OF INNER WHILE  LOOP
-        n += 1
-        ### END OF OUTER WHILE LOOP
+            n += 1
+            ### END OF OUTER WHILE LOOP
     if problem == True:
         testBoards.append(newBoard)
     with open(badout, 'a') as file_object:
         json.dump(testBoards, file_object)
-    with open(datafile, 'a') as file2:
-        json.dump(results, file2)
-    # If len(results) is the same as the number of boards we are testing, then
-    # the algorithm successfully solved all puzzles given to it.
-    print("The length of testResults is: ", len(results))
+    # If the number of boards tested is the same as boardsToTest, then the
+    # algorithm successfully solved all puzzles given to it.
+    print("The number of boards tested is: ", n)
+    print("Decision cache: ", getMoveCacheStats())
+
+
+def solveChunk(chunk):
+    # Worker ftn for runParallel.  'chunk' is (chunkNumber, boardsInChunk,
+    # seed, uniform, optimize).  The chunk's boards are made all at once by
+    # generateScrambles, or by generateUniformBoards when uniform is True
+    # (puzzleGenerators.py), seeded from the seed and the chunk number, so a
+    # chunk always gets the same boards no matter which worker process runs
+    # it, how many workers there are, or which machine it runs on.  Returns
+    # the results for each board as (packed board, clicks, status, seconds),
+    # the boards that needed more than 250 clicks, and the board that caused
+    # a problem (None if there was none), as in main.
+    chunkNumber, boardsInChunk, seed, uniform, optimize = chunk
+    if uniform:
+        scrambles = packScrambles(generateUniformBoards(boardsInChunk, [seed, chunkNumber]))
+    else:
+        scrambles = packScrambles(generateScrambles(boardsInChunk, 130, [seed, chunkNumber]))
+    SOLVEDBOARD = Board(getStartingBoard())
+    testBoards = []
+    results = []
+    for packed in scrambles:
+        mainBoard = Board(int(packed))
+        newBoard = str(mainBoard[:])
+        solveStart = datetime.now()
+        moves, status = solve(mainBoard, 360, SOLVEDBOARD)
+        seconds = (datetime.now() - solveStart).total_seconds()
+        clicks = len(moves)
+        resultClicks = len(optimizeMoves(mainBoard, moves)) if optimize else clicks
+        results.append((packBoard(mainBoard), resultClicks, status, seconds))
+        if status != SOLVED:
+            return results, testBoards, newBoard
+        if clicks > 250:
+            testBoards.append(newBoard)
+            testBoards.append(str(clicks))
+    return results, testBoards, None
+
+
+def runParallel(boardsToTest=250000, chunkSize=2000, processes=None, seed=0,
+                uniform=False, optimize=True):
+    # Same test as main, spread over a pool of worker processes (one per core
+    # by default).  The boards are handed out in chunks of chunkSize so that
+    # each worker gets a steady supply of work, and the chunks' results are
+    # merged in chunk order.  Each chunk's boards come from [seed,
+    # chunkNumber], so the same seed and chunkSize (whatever the number of
+    # processes) give the same boards, clicks and statuses; a different
+    # chunkSize gives different boards, and the solve times always vary
+    # from run to run.  As in main, the run stops at the first board the
+    # algorithm cannot solve within 360 clicks (or for which it returns None
+    # or 'Stop'); that board is written to the problem boards file.  uniform
+    # and optimize are as in main.
+    filepath = ''
+    badout = filepath + 'sp_problemBoards.json'
+    datafile = filepath + 'sp_allTestResults.ndjson'
+    columnPrefix = filepath + 'sp_allTestResults'
+
+    chunks = []
+    for chunkNumber in range((boardsToTest + chunkSize - 1) // chunkSize):
+        boardsInChunk = min(chunkSize, boardsToTest - chunkNumber * chunkSize)
+        chunks.append((chunkNumber, boardsInChunk, seed, uniform, optimize))
+    testBoards = []
+    boardsTested = 0
+    problemBoard = None
+    # each worker keeps its own decision cache for all of its chunks
+    with ResultWriter(datafile) as writer, ColumnWriter(columnPrefix) as columns, \
+            multiprocessing.Pool(processes, enableMoveCache, (200000,)) as pool:
+        for chunkResults, chunkBoards, chunkProblem in pool.imap(solveChunk, chunks):
+            for result in chunkResults:
+                writer.write(*result)
+                columns.write(*result)
+            boardsTested += len(chunkResults)
+            testBoards.extend(chunkBoards)
+            if chunkProblem is not None:
+                problemBoard = chunkProblem
+                break
+    if problemBoard is not None:
+        testBoards.append(problemBoard)
+    with open(badout, 'a') as file_object:
+        json.dump(testBoards, file_object)
+    print("The number of boards tested is: ", boardsTested)
+    return boardsTested
+
+
+def measureOptimalityGap(boardsToTest=100):
+    # Solve the same boards with the algorithm and with the optimal (IDA*)
+    # solver and report how many extra clicks the algorithm needs (after
+    # peephole optimization).  The optimal solver is much slower, so use far
+    # fewer boards than in main.
+    SOLVEDBOARD = Board(getStartingBoard())
+    algClicks = []
+    optClicks = []
+    for n in range(boardsToTest):
+        mainBoard, solutionSeq = generateNewPuzzle(130)
+        moves, status = solve(mainBoard, 360, SOLVEDBOARD)
+        optMoves, optStatus = slidePuzzle_optimal.solve(mainBoard, None, SOLVEDBOARD)
+        if status == SOLVED and optStatus == SOLVED:
+            algClicks.append(len(optimizeMoves(mainBoard, moves)))
+            optClicks.append(len(optMoves))
+    gaps = [a - o for a, o in zip(algClicks, optClicks)]
+    print("Boards compared: ", len(gaps))
+    print("Average algorithm clicks: ", sum(algClicks) / len(algClicks))
+    print("Average optimal clicks: ", sum(optClicks) / len(optClicks))
+    print("Average optimality gap: ", sum(gaps) / len(gaps))
+    print("Maximum optimality gap: ", max(gaps))
+    return gaps
+
+
+def measureScaling(sizes=range(5, 21), boardsPerSize=20):
+    # Solve square boards of each size with the size-generic row-by-row
+    # solver (slidePuzzle_general.py) and report how the number of moves and
+    # the time per move grow with the size of the board.  Each board is
+    # scrambled with 20 random moves per cell.
+    scaling = {}
+    print("size   average moves   ms per board   us per move")
+    for size in sizes:
+        totalMoves = 0
+        totalSeconds = 0
+        for n in range(boardsPerSize):
+            board = slidePuzzle_general.generatePuzzleOfSize(size, size, 20 * size * size)
+            start = datetime.now()
+            moves, status = slidePuzzle_general.solve(board)
+            delta = datetime.now() - start
+            if status != SOLVED:
+                print("Could not solve: ", board)
+            totalMoves += len(moves)
+            totalSeconds += delta.seconds + delta.microseconds / 1000000
+        averageMoves = totalMoves / boardsPerSize
+        perMove = totalSeconds / max(1, totalMoves)
+        scaling[size] = (averageMoves, perMove)
+        print("%2dx%-2d  %13.1f  %13.2f  %12.2f" % (size, size, averageMoves,
+              1000 * totalSeconds / boardsPerSize, 1000000 * perMove))
+    return scaling
 
 
 def getStartingBoard():
@@ -137,6 +276,10 @@ def getStartingBoard():
 
 def getBlankPosition(board):
     # Return the x and y of board coordinates of the blank space.
+    if isinstance(board, int):
+        return getPackedPosition(board, BLANK)
+    if isinstance(board, Board):
+        return board.getBlankPosition()
     for x in range(BOARDWIDTH):
         for y in range(BOARDHEIGHT):
             if board[x][y] == BLANK:
@@ -145,6 +288,13 @@ def getBlankPosition(board):
 
 def makeMove(board, move, alg_ON=False):
     # This function does not check if the move is valid.
+    # A packed board (an int) cannot be changed in place, so the moved packed
+    # board is returned instead; list boards are still changed in place.
+    if isinstance(board, int):
+        return makePackedMove(board, move, alg_ON)
+    if isinstance(board, Board):
+        board.makeMove(move, alg_ON)
+        return
     blankx, blanky = getBlankPosition(board)
 
     if not alg_ON:
@@ -195,11 +345,16 @@ def getRandomMove(board, lastMove=None):
     return random.choice(validMoves)
 
 
-def generateNewPuzzle(numSlides):
+def generateNewPuzzle(numSlides, uniform=False):
     # From a starting configuration, make numSlides number of moves (and
     # animate these moves).
+    # With uniform=True the board is instead drawn uniformly from all of the
+    # solvable boards (see getRandomSolvableBoard); numSlides is ignored and
+    # the sequence of moves is empty.
     sequence = []
-    board = getStartingBoard()
+    if uniform:
+        return (Board(getRandomSolvableBoard()), sequence)
+    board = Board(getStartingBoard())
     lastMove = None
     for i in range(numSlides):
         move = getRandomMove(board, lastMove)
@@ -209,29 +364,33 @@ def generateNewPuzzle(numSlides):
     return (board, sequence)
 
 
-start = datetime.now()
+# The timing and the summary below run only when this file is run as a
+# program, not when it is imported (by runParallel's worker processes, for
+# instance).
 if __name__ == '__main__':
-    main()
-stop = datetime.now()
-delta = stop - start
-time_val = round(delta.seconds + delta.microseconds/1000000, 2)
-print(time_val)
-
-# test pgm needs ~15 minutes to run 100,000 boards through the algorithm.
-
-filepath = ''
-datafile = filepath + 'sp_allTestResults.json'
-with open(datafile) as f_obj:
-    mydat = json.load(f_obj)
-
-print("Number of trials is: ", str(len(mydat)))
-print("Maximum number of clicks is: ", str(max(mydat)))
-print("Minimum number of clicks is: ", str(min(mydat)))
-
-
-import numpy as np
-print("The average number of clicks is: ", str(np.mean(mydat)))
-print("The median number of clicks is: ", str(np.median(mydat)))
+    start = datetime.now()
+    main()  # or runParallel() to use every core
+    stop = datetime.now()
+    delta = stop - start
+    time_val = round(delta.seconds + delta.microseconds/1000000, 2)
+    print(time_val)
+
+    # test pgm needs ~15 minutes to run 100,000 boards through the algorithm.
+
+    # The summary is taken from the binary column files through
+    # numpy.memmap (see resultFiles.py), so it works for any number of
+    # boards.  summarizeResults gives the same summary from the NDJSON file
+    # when numpy is not available.
+    filepath = ''
+    summary = summarizeColumns(filepath + 'sp_allTestResults')
+
+    print("Number of trials is: ", str(summary['trials']))
+    print("Maximum number of clicks is: ", str(summary['maximum']))
+    print("Minimum number of clicks is: ", str(summary['minimum']))
+    print("The average number of clicks is: ", str(summary['mean']))
+    print("The median number of clicks is: ", str(summary['median']))
+    print("The standard deviation is: ", str(summary['standard deviation']))
+    print("Statuses: ", summary['statuses'])
 
 
 